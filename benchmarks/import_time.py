@@ -0,0 +1,108 @@
+"""
+Cold-start import budget check.
+
+Run from the repository root:
+
+    python -m benchmarks.import_time --budget 3.0
+
+Imports the dashboard controller in a fresh interpreter, reports the slowest
+modules it imports directly from -X importtime, and exits non-zero if the
+import exceeds the budget or pulls in dependencies that should load lazily.
+tests/test_import_time.py runs the same check under pytest.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_MODULE = 'src.controllers.main_controller'
+LAZY_MODULES = ('langchain', 'langchain_openai', 'nltk', 'textblob', 'scipy')
+DEFAULT_BUDGET_SECONDS = 3.0
+
+
+def parse_importtime(stderr):
+    """Parse -X importtime output into (depth, module, cumulative microseconds) in output order"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        cumulative = cumulative.strip()
+        if not cumulative.isdigit():
+            continue
+        # One leading space, then two more per nesting level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((depth, name.strip(), int(cumulative)))
+    return entries
+
+
+def direct_imports(entries, module):
+    """
+    Cumulative time of each module imported directly by module. Children are
+    reported before their parent, one level deeper, so walk back from the
+    module's own line until reaching its depth again.
+    """
+    positions = [i for i, (_, name, _) in enumerate(entries) if name == module]
+    if not positions:
+        return {}
+    position = positions[-1]
+    depth = entries[position][0]
+
+    children = {}
+    for child_depth, name, cumulative in reversed(entries[:position]):
+        if child_depth <= depth:
+            break
+        if child_depth == depth + 1:
+            children[name] = cumulative
+    return children
+
+
+def measure_import(module=ENTRY_MODULE):
+    """
+    Import module in a clean interpreter. Returns (seconds, cumulative
+    microseconds per directly imported module, eagerly imported lazy modules).
+    """
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(time.perf_counter() - start)\n"
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))\n"
+    )
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, check=True, cwd=REPO_ROOT
+    )
+    seconds_line, eager_line = proc.stdout.splitlines()[-2:]
+
+    children = direct_imports(parse_importtime(proc.stderr), module)
+    eager = [m for m in eager_line.split(',') if m]
+    return float(seconds_line), children, eager
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the dashboard cold-start import time")
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET_SECONDS,
+                        help="Maximum allowed import time in seconds")
+    parser.add_argument('--top', type=int, default=10, help="Number of slowest direct imports to list")
+    args = parser.parse_args()
+
+    seconds, children, eager = measure_import()
+    print(f"import {ENTRY_MODULE}: {seconds:.3f}s (budget {args.budget:.3f}s)")
+    for name, micros in sorted(children.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<40} {micros / 1e6:>8.3f}s")
+
+    failed = False
+    if eager:
+        print(f"Eagerly imported modules that should load lazily: {', '.join(eager)}")
+        failed = True
+    if seconds > args.budget:
+        print("Import time is over budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""
+Multi-session load test for the dashboard.
+
+Run from the repository root:
+
+    python -m benchmarks.load_test --sessions 8 --interactions 20
+    python -m benchmarks.load_test --sessions 16 --max-p95 2.0 --output load.json
+
+Each simulated session drives app.py headlessly through Streamlit's AppTest,
+applying randomized filter, phrase, trending and chat interactions. With
+--filter-mode apply, filter changes are staged and submitted with the
+"Apply filters" button. The OpenAI chat is replaced by an in-process stub, so
+no network is needed.
+
+All sessions live in this one process and share its Streamlit caches and
+background precompute worker, as sessions of one server do. AppTest swaps
+process-global state on every run, so reruns are interleaved round-robin
+across sessions rather than run in parallel: the test measures the per-rerun
+latency a session sees against a warm shared server and the memory each
+extra live session adds, not contention between simultaneous reruns. The
+first session's first run pays the cold start and is reported separately.
+Exits non-zero if --max-p95 is exceeded.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+from streamlit.testing.v1 import AppTest
+
+import src.views.chat_view as chat_view
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+INCLUDE_WORDS = ['lung', 'ttlc25', 'immunotherapy', 'adc', 'trial', 'egfr']
+QUESTIONS = ['Which user has the most views?', 'Summarize the sentiment', 'What are the top hashtags?']
+
+
+class StubAgent:
+    """Stands in for the langchain agent: fixed latency, canned answer, no network"""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def run(self, prompt):
+        time.sleep(self.latency)
+        return f"Stub answer to: {prompt}"
+
+
+def install_chat_stub(latency):
+    """Patch chat_view so the chat tab uses StubAgent instead of OpenAI"""
+    chat_view.setup_language_model = lambda: object()
+    chat_view.create_agent = lambda csv_string, llm: StubAgent(latency)
+    chat_view.run_agent = lambda agent, prompt: agent.run(prompt)
+
+
+def current_rss_mb():
+    """Resident set size of this process, from /proc when available"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError):
+        import resource
+
+        # ru_maxrss is the peak, in KB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def find(widgets, label):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    return None
+
+
+def random_range(widget, rng):
+    low, high = sorted(rng.sample(range(int(widget.min), int(widget.max) + 1), 2))
+    return low, high
+
+
+# Sidebar filters live in the "Apply filters" form when FILTER_MODE=apply
+FILTER_WIDGETS = [
+    ('sentiment', lambda at: find(at.multiselect, "Select Sentiment")),
+    ('include_words', lambda at: find(at.text_input, "Include Posts with Words (comma-separated)")),
+    ('likes', lambda at: find(at.slider, "Number of Likes")),
+    ('followers', lambda at: find(at.slider, "Number of Followers")),
+    ('collapse', lambda at: find(at.checkbox, "Collapse near-duplicate posts")),
+]
+PANEL_WIDGETS = [
+    ('phrase_length', lambda at: find(at.slider, "Phrase Length (words)")),
+    ('common_terms', lambda at: find(at.checkbox, "Include common terms")),
+    ('trending_window', lambda at: find(at.number_input, "Window (days)")),
+    ('chat', lambda at: at.chat_input[0] if len(at.chat_input) else None),
+]
+MAX_STAGED_CHANGES = 3
+
+
+def change_widget(name, widget, rng):
+    """Give a widget a random new value; returns False if it cannot change"""
+    if name == 'sentiment':
+        widget.set_value(rng.sample(['Positive', 'Neutral', 'Negative'], rng.randint(1, 3)))
+    elif name == 'include_words':
+        widget.input(rng.choice(INCLUDE_WORDS + ['']))
+    elif name in ('likes', 'followers'):
+        if widget.min == widget.max:
+            return False
+        widget.set_value(random_range(widget, rng))
+    elif name == 'phrase_length':
+        widget.set_value(tuple(sorted(rng.sample(range(2, 9), 2))))
+    elif name in ('collapse', 'common_terms'):
+        widget.set_value(not widget.value)
+    elif name == 'trending_window':
+        widget.set_value(rng.randint(1, 3))
+    elif name == 'chat':
+        widget.set_value(rng.choice(QUESTIONS))
+    return True
+
+
+def random_interaction(at, rng, filter_mode):
+    """
+    Apply one randomized interaction; returns its name, or None if nothing is
+    available. In apply mode a filter interaction stages up to
+    MAX_STAGED_CHANGES form changes and submits them with one click, so each
+    interaction costs the single rerun the mode is meant to deliver.
+    """
+    use_filters = rng.random() < len(FILTER_WIDGETS) / (len(FILTER_WIDGETS) + len(PANEL_WIDGETS))
+    choices = list(FILTER_WIDGETS if use_filters else PANEL_WIDGETS)
+    rng.shuffle(choices)
+
+    staged = []
+    limit = MAX_STAGED_CHANGES if use_filters and filter_mode == 'apply' else 1
+    for name, lookup in choices:
+        widget = lookup(at)
+        if widget is not None and change_widget(name, widget, rng):
+            staged.append(name)
+            if len(staged) == limit:
+                break
+    if not staged:
+        return None
+
+    if use_filters and filter_mode == 'apply':
+        apply_button = find(at.button, "Apply filters")
+        if apply_button is None:
+            return None
+        apply_button.click()
+        return 'apply_filters'
+    return staged[0]
+
+
+class SimulatedSession:
+    """One dashboard session: its own AppTest (session state) and random stream"""
+
+    def __init__(self, session_id, timeout, seed, filter_mode):
+        self.rng = random.Random(seed + session_id)
+        self.filter_mode = filter_mode
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.at.secrets['OPENAI_API_KEY'] = 'stub'
+        self.latencies = []
+        self.errors = []
+
+    def timed_run(self, action):
+        start = time.perf_counter()
+        try:
+            self.at.run()
+            failed = len(self.at.exception) > 0
+        except Exception:
+            failed = True
+        self.latencies.append((action, time.perf_counter() - start))
+        if failed:
+            self.errors.append(action)
+
+    def interact(self):
+        """Run one random interaction; returns False once none is available"""
+        action = random_interaction(self.at, self.rng, self.filter_mode)
+        if action is None:
+            return False
+        self.timed_run(action)
+        return True
+
+
+def run_sessions(sessions, interactions, timeout, seed, filter_mode, chat_latency):
+    """
+    Open sessions one after another, then interleave their interactions
+    round-robin. Returns (sessions, cold start seconds, RSS in MB after the
+    cold start, RSS in MB at the end).
+    """
+    os.environ['FILTER_MODE'] = filter_mode
+    install_chat_stub(chat_latency)
+
+    simulated = [SimulatedSession(i, timeout, seed, filter_mode) for i in range(sessions)]
+    simulated[0].timed_run('cold_start')
+    cold_start = simulated[0].latencies[0][1]
+    rss_warm = current_rss_mb()
+
+    for session in simulated[1:]:
+        session.timed_run('initial')
+
+    active = list(simulated)
+    for _ in range(interactions):
+        active = [session for session in active if session.interact()]
+        if not active:
+            break
+    return simulated, cold_start, rss_warm, current_rss_mb()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100
+    low, high = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (k - low)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive many simulated dashboard sessions against shared caches")
+    parser.add_argument('--sessions', type=int, default=8, help="Simulated sessions")
+    parser.add_argument('--interactions', type=int, default=20, help="Widget interactions per session")
+    parser.add_argument('--timeout', type=float, default=120, help="Per-rerun timeout in seconds")
+    parser.add_argument('--chat-latency', type=float, default=0.5, help="Stub chat response time in seconds")
+    parser.add_argument('--filter-mode', default='live', choices=['live', 'apply'])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-p95', type=float, help="Fail if p95 rerun latency exceeds this many seconds")
+    parser.add_argument('--output', help="Write the report as JSON to this path")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    sessions, cold_start, rss_warm, rss_end = run_sessions(
+        args.sessions, args.interactions, args.timeout, args.seed, args.filter_mode, args.chat_latency
+    )
+    # Throughput is for the warm server, so leave the cold start out
+    wall = time.perf_counter() - start - cold_start
+
+    latencies = [(action, elapsed) for session in sessions for action, elapsed in session.latencies
+                 if action != 'cold_start']
+    errors = [action for session in sessions for action in session.errors]
+
+    durations = [elapsed for _, elapsed in latencies]
+    by_action = {}
+    for action, elapsed in latencies:
+        by_action.setdefault(action, []).append(elapsed)
+
+    report = {
+        'sessions': args.sessions,
+        'interactions_per_session': args.interactions,
+        'filter_mode': args.filter_mode,
+        'reruns': len(durations),
+        'errors': len(errors),
+        'wall_seconds': round(wall, 3),
+        'throughput_reruns_per_sec': round(len(durations) / wall, 3) if wall else 0,
+        'latency_seconds': {
+            'mean': round(statistics.mean(durations), 4) if durations else 0,
+            'p50': round(percentile(durations, 50), 4),
+            'p90': round(percentile(durations, 90), 4),
+            'p95': round(percentile(durations, 95), 4),
+            'p99': round(percentile(durations, 99), 4),
+            'max': round(max(durations), 4) if durations else 0,
+        },
+        'latency_p50_by_action': {action: round(percentile(values, 50), 4)
+                                  for action, values in sorted(by_action.items())},
+        'cold_start_seconds': round(cold_start, 3),
+        'rss_warm_mb': round(rss_warm, 1),
+        'rss_growth_mb_per_session': round((rss_end - rss_warm) / args.sessions, 1),
+    }
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.max_p95 is not None and report['latency_seconds']['p95'] > args.max_p95:
+        print(f"p95 latency {report['latency_seconds']['p95']}s exceeds budget {args.max_p95}s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
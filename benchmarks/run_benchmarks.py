@@ -0,0 +1,172 @@
+"""
+Benchmark suite for the data model and views pipeline.
+
+Run from the repository root:
+
+    python -m benchmarks.run_benchmarks --sizes 1000 100000
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/<old>.json benchmarks/results/<new>.json
+
+Each stage is timed in an untraced run and its peak memory recorded in a
+separate run under tracemalloc. Results are written as JSON to
+benchmarks/results/<commit>.json so they can be compared across commits.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from benchmarks.synthetic_data import write_posts_csv
+from src.models.data_model import (
+    analyze_text_content,
+    get_hashtag_frequency,
+    get_sentiment,
+    get_word_frequency,
+    load_and_process_data,
+)
+from src.models.dedup_model import assign_duplicate_clusters
+from src.models.sentiment_model import get_sentiment_backend
+from src.views.filters_view import display_filters
+from src.views.metrics_view import (
+    create_engagement_scatter,
+    create_hashtag_chart,
+    create_location_chart,
+    create_pie_chart,
+    create_user_table,
+    create_word_freq_chart,
+)
+
+RESULTS_DIR = os.path.join('benchmarks', 'results')
+DEFAULT_SIZES = [1000, 100000]
+
+
+def measure(func, *args, **kwargs):
+    """
+    Return (result, seconds, peak traced memory in MB). func runs twice: the
+    timed run is untraced, since tracemalloc slows pure-Python code unevenly,
+    and a second traced run only records peak memory.
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak / 1024 ** 2
+
+
+def build_stages(csv_path):
+    """
+    Return the ordered (name, func) benchmark stages. Each func takes the
+    processed frame (or None for loading) and returns the stage's output.
+    """
+    def content_text(df):
+        return ' '.join(df['content'].astype(str))
+
+    def sentiment_textblob(df):
+        return df['content'].apply(get_sentiment)
+
+    def sentiment_lexicon(df):
+        return get_sentiment_backend('lexicon').score(df['content'])
+
+    return [
+        ('load_and_process_data', lambda df: load_and_process_data(csv_path, sentiment_backend='lexicon')),
+        ('assign_duplicate_clusters', lambda df: assign_duplicate_clusters(df['content'])),
+        ('get_sentiment', sentiment_textblob),
+        ('sentiment_lexicon_backend', sentiment_lexicon),
+        ('get_word_frequency', lambda df: get_word_frequency(content_text(df))),
+        ('analyze_text_content', lambda df: analyze_text_content(content_text(df))),
+        ('get_hashtag_frequency', lambda df: get_hashtag_frequency(df['content'])),
+        ('display_filters', display_filters),
+        ('create_engagement_scatter', create_engagement_scatter),
+        ('create_word_freq_chart', create_word_freq_chart),
+        ('create_pie_chart', lambda df: create_pie_chart(df['sentiment'].value_counts())),
+        ('create_location_chart', lambda df: create_location_chart(df['location'].fillna('Unknown').value_counts())),
+        ('create_hashtag_chart', lambda df: create_hashtag_chart(get_hashtag_frequency(df['content']))),
+        ('create_user_table', create_user_table),
+    ]
+
+
+def run_size(n_rows, stages=None, seed=0):
+    """Benchmark every stage on a synthetic dataset of n_rows posts"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = write_posts_csv(n_rows, os.path.join(tmp, 'posts.csv'), seed=seed)
+        df = None
+        for name, func in build_stages(csv_path):
+            if stages and name not in stages and name != 'load_and_process_data':
+                continue
+            output, seconds, peak_mb = measure(func, df)
+            if df is None:
+                df = output
+            results[name] = {'seconds': round(seconds, 6), 'peak_mb': round(peak_mb, 3)}
+            print(f"{n_rows:>10,} rows  {name:<28} {seconds:>10.4f}s  {peak_mb:>10.2f} MB")
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except Exception:
+        return 'unknown'
+
+
+def compare(old_path, new_path):
+    """Print per-stage time ratios between two result files"""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    print(f"{old['commit']} -> {new['commit']}")
+    for size, stages in new['results'].items():
+        for name, stats in stages.items():
+            before = old['results'].get(size, {}).get(name)
+            if before is None or before['seconds'] == 0:
+                continue
+            ratio = stats['seconds'] / before['seconds']
+            flag = '  REGRESSION' if ratio > 1.2 else ''
+            print(f"{int(size):>10,} rows  {name:<28} {before['seconds']:>9.4f}s -> "
+                  f"{stats['seconds']:>9.4f}s  x{ratio:.2f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the data model and views pipeline")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Synthetic dataset sizes in rows, e.g. 1000 100000 1000000")
+    parser.add_argument('--stages', nargs='+', help="Only run these stages (loading always runs)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Result JSON path (default benchmarks/results/<commit>.json)")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="Compare two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': {str(n): run_size(n, args.stages, args.seed) for n in args.sizes},
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f'{commit}.json')
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
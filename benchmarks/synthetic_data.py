@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+NUMERIC_COLUMNS = ['replies', 'reposts', 'likes', 'views', 'followers']
+
+EXTRA_HASHTAGS = [
+    'lcsm', 'lungcancer', 'nsclc', 'sclc', 'oncology', 'immunotherapy', 'adcs', 'egfr',
+    'alk', 'kras', 'biomarkers', 'meded', 'radiotherapy', 'clinicaltrials', 'precisiononcology',
+]
+FILLER_SENTENCES = [
+    'Great discussion on first line treatment options',
+    'Looking forward to the next session on targeted therapy',
+    'Important data presented today on overall survival',
+    'Thanks to all the speakers and panelists',
+    'New trial results could change clinical practice',
+    'Join us for the satellite symposium tomorrow',
+    'Key takeaways from the morning plenary session',
+]
+
+
+def _format_counts(values, rng, comma_share=0.5):
+    """Render integers as strings, comma-formatting a share of the large ones like the source feed"""
+    as_text = values.astype(str).astype(object)
+    with_commas = (values >= 1000) & (rng.random(len(values)) < comma_share)
+    as_text[with_commas] = [f"{v:,}" for v in values[with_commas]]
+    return as_text
+
+
+def generate_posts(n_rows, base_path='ttlc25.csv', seed=0):
+    """
+    Generate n_rows synthetic posts with the ttlc25.csv schema. Content is
+    resampled from the real posts and extended with random hashtags, mentions
+    and filler sentences; engagement counts follow a heavy-tailed distribution.
+    """
+    rng = np.random.default_rng(seed)
+    base = pd.read_csv(base_path, dtype=str, keep_default_na=False)
+
+    picks = rng.integers(0, len(base), n_rows)
+    df = base.iloc[picks].reset_index(drop=True)
+
+    handles = base['handle'].replace('', np.nan).dropna().unique()
+    base_tags = (base['tags'].str.findall(r'#(\w+)').explode().dropna().str.lower().unique())
+    hashtag_pool = np.array(sorted(set(base_tags) | set(EXTRA_HASHTAGS)), dtype=object)
+
+    n_tags = rng.integers(0, 4, n_rows)
+    tag_choices = rng.choice(hashtag_pool, size=(n_rows, 3))
+    mention_choices = rng.choice(handles, n_rows)
+    has_mention = rng.random(n_rows) < 0.3
+    filler = rng.choice(np.array(FILLER_SENTENCES, dtype=object), n_rows)
+    has_filler = rng.random(n_rows) < 0.5
+
+    suffixes = [
+        ' '.join(
+            ([sentence] if add_sentence else []) +
+            ([mention] if add_mention else []) +
+            ['#' + tag for tag in tags[:count]]
+        )
+        for sentence, add_sentence, mention, add_mention, tags, count
+        in zip(filler, has_filler, mention_choices, has_mention, tag_choices, n_tags)
+    ]
+    df['content'] = df['content'] + ' ' + pd.Series(suffixes, dtype=object)
+
+    start = pd.Timestamp('2025-02-15')
+    df['date'] = (start + pd.to_timedelta(rng.integers(0, 14 * 24, n_rows), unit='h')).strftime('%Y-%m-%d')
+
+    scales = {'replies': 3, 'reposts': 5, 'likes': 30, 'views': 1500, 'followers': 8000}
+    for col in NUMERIC_COLUMNS:
+        values = np.floor(rng.pareto(1.5, n_rows) * scales[col]).astype(np.int64)
+        df[col] = _format_counts(values, rng)
+
+    return df
+
+
+def write_posts_csv(n_rows, path, base_path='ttlc25.csv', seed=0):
+    """Generate synthetic posts and write them as CSV to path"""
+    generate_posts(n_rows, base_path=base_path, seed=seed).to_csv(path, index=False)
+    return path
@@ -0,0 +1,179 @@
+import cProfile
+import csv
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+
+logger = logging.getLogger(__name__)
+
+# Profiling is off unless TTLC_PROFILE lists one or more modes: "timing",
+# "memory" (tracemalloc) and "cprofile". The ?profile= query param is only
+# honoured when TTLC_PROFILE_ALLOW_QUERY=1, since tracing slows every session.
+PROFILE_ENV_VAR = 'TTLC_PROFILE'
+PROFILE_QUERY_ENV_VAR = 'TTLC_PROFILE_ALLOW_QUERY'
+PROFILE_LOG_ENV_VAR = 'TTLC_PROFILE_LOG'
+PROFILE_MODES = ('timing', 'memory', 'cprofile')
+
+# Streamlit runs each session's script on its own thread
+_local = threading.local()
+
+# tracemalloc and cProfile are process-wide: their peaks and profiles would mix
+# concurrent sessions, so only one run at a time may use each
+_memory_lock = threading.Lock()
+_profiler_lock = threading.Lock()
+
+
+class RunRecorder:
+    """Collects per-stage durations (and optionally memory) for one script rerun"""
+
+    def __init__(self, modes):
+        self.modes = set(modes)
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        self.records = []
+        self.profile_text = None
+        self.notes = []
+        self._profiler = None
+        self._started_tracemalloc = False
+        self._start = None
+
+    @property
+    def track_memory(self):
+        return 'memory' in self.modes
+
+    def start(self):
+        if self.track_memory:
+            if _memory_lock.acquire(blocking=False):
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    self._started_tracemalloc = True
+            else:
+                self.modes.discard('memory')
+                self.notes.append("Memory tracking skipped: another session is measuring memory.")
+        if 'cprofile' in self.modes:
+            if _profiler_lock.acquire(blocking=False):
+                self._profiler = cProfile.Profile()
+                self._profiler.enable()
+            else:
+                self.notes.append("cProfile skipped: another session is already being profiled.")
+        self._start = time.perf_counter()
+
+    def stop(self):
+        self.records.append(self._record('total', time.perf_counter() - self._start))
+        if self._profiler is not None:
+            self._profiler.disable()
+            _profiler_lock.release()
+            out = io.StringIO()
+            pstats.Stats(self._profiler, stream=out).sort_stats('cumulative').print_stats(30)
+            self.profile_text = out.getvalue()
+        if self.track_memory:
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+            _memory_lock.release()
+
+    def _record(self, stage, seconds, peak_mb=None):
+        return {
+            'run': self.started_at,
+            'stage': stage,
+            'seconds': round(seconds, 6),
+            'peak_mb': None if peak_mb is None else round(peak_mb, 3),
+        }
+
+    @contextmanager
+    def stage(self, name):
+        if self.track_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1024 ** 2 if self.track_memory else None
+            self.records.append(self._record(name, elapsed, peak_mb))
+
+    def to_csv(self):
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=['run', 'stage', 'seconds', 'peak_mb'])
+        writer.writeheader()
+        writer.writerows(self.records)
+        return out.getvalue()
+
+    def export(self, path=None):
+        """Log the run's stage timings and append them to the CSV log, if configured"""
+        for record in self.records:
+            logger.info("stage=%s seconds=%.4f peak_mb=%s", record['stage'], record['seconds'], record['peak_mb'])
+
+        path = path or os.environ.get(PROFILE_LOG_ENV_VAR)
+        if not path:
+            return
+        write_header = not os.path.exists(path)
+        with open(path, 'a', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=['run', 'stage', 'seconds', 'peak_mb'])
+            if write_header:
+                writer.writeheader()
+            writer.writerows(self.records)
+
+
+def parse_modes(value):
+    """Parse a comma-separated list of profiling modes. '1'/'true'/'all' enable everything."""
+    if not value:
+        return set()
+    value = value.strip().lower()
+    if value in ('1', 'true', 'yes', 'all'):
+        return set(PROFILE_MODES)
+    modes = {mode.strip() for mode in value.split(',')} & set(PROFILE_MODES)
+    return modes | {'timing'} if modes else set()
+
+
+def start_run(query_value=None):
+    """Begin recording a rerun if profiling is enabled; returns the recorder or None"""
+    if os.environ.get(PROFILE_QUERY_ENV_VAR) != '1':
+        query_value = None
+    modes = parse_modes(query_value) or parse_modes(os.environ.get(PROFILE_ENV_VAR))
+    recorder = RunRecorder(modes) if modes else None
+    _local.recorder = recorder
+    if recorder is not None:
+        recorder.start()
+    return recorder
+
+
+def finish_run():
+    """Stop recording the current rerun and return its recorder (or None)"""
+    recorder = getattr(_local, 'recorder', None)
+    _local.recorder = None
+    if recorder is not None:
+        recorder.stop()
+        recorder.export()
+    return recorder
+
+
+@contextmanager
+def stage(name):
+    """Time a block of work as a named stage of the current rerun"""
+    recorder = getattr(_local, 'recorder', None)
+    if recorder is None:
+        yield
+        return
+    with recorder.stage(name):
+        yield
+
+
+def timed(name=None):
+    """Decorator form of stage(); defaults to the function name"""
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if getattr(_local, 'recorder', None) is None:
+                return func(*args, **kwargs)
+            with stage(stage_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
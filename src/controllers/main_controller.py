@@ -1,29 +1,40 @@
+import glob
 import traceback
 import os
 import streamlit as st
-import pandas as pd
-
-from src.models.data_model import (
-    categorize_sentiment,
-    get_hashtag_frequency,
-    get_location_counts,
-    get_sentiment,
-    get_word_frequency,
-    analyze_text_content,
-    load_and_process_data,
-)
+
+from src.controllers.instrumentation import finish_run, stage, start_run
+from src.models.data_model import load_and_process_data
+from src.models.dedup_model import assign_duplicate_clusters
+from src.models.precompute import ARTIFACTS, PrecomputeWorker
+from src.models.query_backend import DEFAULT_STORE_PATH, FrameResults, PostStore
+from src.models.sampling_model import SampleResults, filter_sample, top_posts_by_views
+from src.models.sentiment_model import score_sentiment
+from src.models.shared_dataset import load_shared_dataset, shared_dataset_is_current
+from src.models.trending_model import TrendingStore, build_trending_store
 from src.views.dashboard_view import (
     apply_custom_css,
     create_tabs,
+    display_approximate_notice,
+    display_precompute_progress,
     display_title,
+    exact_results_due,
+)
+from src.views.filters_view import (
+    NO_MATCHES_MESSAGE,
+    display_cached_filters,
+    display_frame_filters,
+    display_store_filters,
+    frame_filter_options,
+    select_approximate_mode,
+    stop_with_error,
 )
-from src.views.chat_view import display_chat_tab
-from src.views.filters_view import display_filters
 from src.views.metrics_view import (
     create_engagement_scatter,
     create_hashtag_chart,
     create_location_chart,
     create_pie_chart,
+    create_trending_chart,
     create_time_series,
     create_user_table,
     create_word_freq_chart,
@@ -39,127 +50,442 @@ def main():
         initial_sidebar_state="expanded"
     )
 
+    recorder = start_run(st.query_params.get('profile'))
+    try:
+        render_dashboard()
+    finally:
+        finish_run()
+
+    if recorder is not None:
+        from src.views.debug_view import display_debug_panel
+
+        display_debug_panel(recorder)
+
+
+DATA_PATH = 'ttlc25.csv'
+
+
+@st.cache_resource
+def get_precompute_worker():
+    """Background pool that builds per-post artifacts, shared by all sessions"""
+    return PrecomputeWorker()
+
+
+@st.cache_resource(max_entries=1)
+def get_shared_dataset(path, mtime):
+    """
+    Map the prebuilt shared dataset once per process; mtime invalidates on
+    rebuild. Only the current version is kept, so a rebuild releases the old
+    mapping (and its tmpfs pages) instead of accumulating one per version.
+    """
+    return load_shared_dataset(path)
+
+
+@st.cache_resource(max_entries=1)
+def get_processed_data(path, mtime, sentiment_backend=None):
+    """
+    Load and normalize the CSV once per process; mtime invalidates the cache
+    when the file changes. With a sentiment_backend, duplicate clusters and
+    sentiment are computed here too (see load_sentiment_backend). Treat the
+    frame as shared and read-only.
+    """
+    return load_and_process_data(path, sentiment_backend=sentiment_backend,
+                                 detect_duplicates=sentiment_backend is not None)
+
+
+def load_sentiment_backend():
+    """
+    The sentiment backend to score with while loading when PRECOMPUTE=0, so
+    the synchronous fallback runs once per file rather than once per rerun;
+    None when the background worker builds those artifacts.
+    """
+    if os.environ.get('PRECOMPUTE', '1') == '0':
+        return os.environ.get('SENTIMENT_BACKEND', 'textblob')
+    return None
+
+
+def get_cached_frame(source, path, version):
+    """The cached posts frame behind a pandas source"""
+    if source == 'shared':
+        return get_shared_dataset(path, version)
+    return get_processed_data(path, version, load_sentiment_backend())
+
+
+@st.cache_resource(max_entries=1)
+def get_sample_positions(source, path, version):
+    """Row positions of the sample drawn at ingest, found once per cached frame"""
+    return get_cached_frame(source, path, version)['sample_weight'].to_numpy().nonzero()[0]
+
+
+@st.cache_resource(max_entries=1)
+def get_view_order(source, path, version):
+    """Row positions by descending views, for finding top posts from the head of the frame"""
+    views = get_cached_frame(source, path, version)['views'].to_numpy()
+    return (-views).argsort(kind='stable')
+
+
+@st.cache_resource(max_entries=1)
+def get_filter_options(source, path, version):
+    """Sidebar options over the whole cached frame, for approximate mode"""
+    return frame_filter_options(get_cached_frame(source, path, version))
+
+
+@st.cache_resource
+def get_post_store(store_path):
+    """Open the Parquet post store once per server process"""
+    return PostStore(store_path)
+
+
+def trending_builder(source, path, version):
+    """
+    A callable that buckets phrase and hashtag counts from the same posts the
+    rest of the dashboard reads. The posts are resolved here, on the script
+    thread, so the returned callable can run on the background worker.
+    """
+    if source == 'duckdb':
+        store = get_post_store(path)
+
+        def build():
+            trending_store = TrendingStore()
+            for batch in store.iter_posts(['date', 'tokens', 'hashtags']):
+                trending_store.add_posts(batch)
+            return trending_store
+        return build
+
+    if source == 'shared':
+        df = get_shared_dataset(path, version)
+    else:
+        df = get_processed_data(path, version, load_sentiment_backend())
+    return lambda: build_trending_store(df)
+
+
+def load_trending_store(source, path):
+    """
+    The trending store for the current source version, built once per process
+    on the background worker; version changes when the source is rebuilt.
+    Returns None, with a progress watcher, while it is still being built.
+    """
+    worker = get_precompute_worker()
+    version = source_version(path)
+    key = ('trending', source, path, version)
+    builder = trending_builder(source, path, version)
+    worker.submit_task(key, 'trending', builder)
+
+    ready = worker.ready_artifacts(key)
+    if 'trending' in ready:
+        return ready['trending']
+    if 'trending' in worker.failed_artifacts(key):
+        return builder()
+
+    display_precompute_progress(worker, key, complete=False)
+    return None
+
+
+def posts_source():
+    """
+    Where this process reads posts from, as (source, path). QUERY_BACKEND=duckdb
+    selects the Parquet store built by `python -m src.models.query_backend`;
+    otherwise replicas on one node share a dataset built by
+    `python -m src.models.shared_dataset` when it is current, and fall back to
+    the CSV.
+    """
+    if os.environ.get('QUERY_BACKEND', 'pandas') == 'duckdb':
+        return 'duckdb', os.environ.get('POST_STORE_PATH', DEFAULT_STORE_PATH)
+
+    shared_path = os.environ.get('SHARED_DATASET_PATH')
+    sentiment_backend = os.environ.get('SENTIMENT_BACKEND', 'textblob')
+    if shared_path and shared_dataset_is_current(shared_path, DATA_PATH, sentiment_backend):
+        return 'shared', shared_path
+    return 'csv', DATA_PATH
+
+
+def source_version(path):
+    """Latest modification time of the file(s) behind a path or glob"""
+    return max((os.path.getmtime(match) for match in glob.glob(path)), default=0)
+
+
+def load_filtered_results(source, path):
+    """
+    Run the sidebar filters against the posts source and return a results
+    object exposing the dashboard aggregates. The DuckDB source pushes filters
+    and aggregates down to the store; the others keep everything in pandas.
+    """
+    if source == 'duckdb':
+        store = get_post_store(path)
+        with stage('filters'):
+            return display_store_filters(store)
+
+    if source == 'shared':
+        with stage('load'):
+            df = get_shared_dataset(path, source_version(path))
+        with stage('filters'):
+            return select_results(df, source, path)
+
+    sentiment_backend = load_sentiment_backend()
+    if sentiment_backend is not None:
+        # Clusters and sentiment were computed with the cached frame
+        with stage('load'):
+            df = get_processed_data(path, source_version(path), sentiment_backend)
+    else:
+        with stage('load'):
+            # Shallow copy: this run's artifact columns must not leak into the cached frame
+            df = get_processed_data(path, source_version(path)).copy(deep=False)
+
+        with stage('precompute'):
+            attach_precomputed_artifacts(df, os.environ.get('SENTIMENT_BACKEND', 'textblob'))
+
+    with stage('filters'):
+        return select_results(df, source, path)
+
+
+def select_results(df, source, path):
+    """
+    Run the sidebar filters over df. Results are exact by default. In
+    approximate mode the sidebar options come from whole-frame aggregates
+    cached per dataset, and the aggregates are estimated from the sample
+    drawn at ingest until the selection stops changing or the user asks for
+    exact results; only then is the full frame filtered.
+    """
+    with st.sidebar:
+        approximate = select_approximate_mode() and 'sample_weight' in df
+    if not approximate:
+        return FrameResults(display_frame_filters(df)[1])
+
+    version = source_version(path)
+    filters = display_cached_filters(get_filter_options(source, path, version), 'sentiment' in df)
+    signature = repr(filters)
+    if not exact_results_due(signature):
+        sample = df.take(get_sample_positions(source, path, version))
+        filtered_sample = filter_sample(sample, filters)
+        # With no sampled matches there is nothing to estimate from
+        if len(filtered_sample):
+            display_approximate_notice(signature)
+            top_posts = top_posts_by_views(df, get_view_order(source, path, version), filters)
+            return SampleResults(sample, filtered_sample, top_posts)
+
+    filtered_df = filters.apply(df)
+    if len(filtered_df) == 0:
+        stop_with_error(NO_MATCHES_MESSAGE)
+    return FrameResults(filtered_df)
+
+
+def attach_precomputed_artifacts(df, sentiment_backend):
+    """
+    Hand the dataset to the background worker and attach whichever artifacts
+    are already built. Missing columns make the views show placeholders until
+    a progress watcher reruns the page; artifacts that failed to build in the
+    background are computed here instead.
+    """
+    worker = get_precompute_worker()
+    key = (DATA_PATH, os.path.getmtime(DATA_PATH), sentiment_backend)
+    worker.submit(key, df['content'], sentiment_backend)
+
+    artifacts = worker.ready_artifacts(key)
+    failed = worker.failed_artifacts(key)
+
+    if 'clusters' in artifacts:
+        df['cluster_id'] = artifacts['clusters']
+    elif 'clusters' in failed:
+        df['cluster_id'] = assign_duplicate_clusters(df['content'])
+
+    if 'sentiment' in artifacts:
+        df['sentiment_score'] = artifacts['sentiment']['sentiment_score'].to_numpy()
+        df['sentiment'] = artifacts['sentiment']['sentiment'].to_numpy()
+    elif 'sentiment' in failed:
+        score_sentiment(df, sentiment_backend)
+
+    complete = len(artifacts) + len(failed) == len(ARTIFACTS)
+    display_precompute_progress(worker, key, complete)
+
+
+def render_dashboard():
     apply_custom_css()
     display_title()
 
     try:
-        df = load_and_process_data()
-        df['sentiment_score'] = df['content'].apply(get_sentiment)
-        df['sentiment'] = df['sentiment_score'].apply(categorize_sentiment)
-
-        filtered_df = display_filters(df)
-
-        metrics = {
-            'Total Posts': len(filtered_df),
-            'Total Views': int(filtered_df['views'].sum()),
-            'Total Reposts': int(filtered_df['reposts'].sum()),
-            'Total Followers': int(filtered_df['followers'].sum()),
-            'Avg. Sentiment': round(filtered_df['sentiment_score'].mean(), 2)
-        }
+        source, path = posts_source()
+        results = load_filtered_results(source, path)
 
-        display_metrics_with_icons(metrics)
+        with stage('metrics'):
+            display_metrics_with_icons(results.metrics(), results.metric_intervals())
 
-        tab1, tab2, tab3 = create_tabs()
+        tab1, tab2, tab3, tab4 = create_tabs()
 
-        with tab1:
-            st.plotly_chart(
-                create_engagement_scatter(filtered_df),
-                use_container_width=True,
-                config={
-                    'displayModeBar': True,
-                    'displaylogo': False,
-                    'modeBarButtonsToRemove': ['lasso2d', 'select2d'],
-                    'scrollZoom': True
-                }
-            )
+        with tab1, stage('engagement_chart'):
+            render_engagement_panel(results)
 
         with tab2:
             col1, col2 = st.columns([0.6, 0.4])
             with col1:
-                # Word frequency section
-                st.markdown("### Phrase Analysis Settings")
-
-                # Controls in a single row
-                control_cols = st.columns([0.6, 0.4])
-                with control_cols[0]:
-                    word_range = st.slider(
-                        "Phrase Length (words)",
-                        min_value=2,
-                        max_value=8,
-                        value=(2, 5),
-                        help="Control the minimum and maximum number of words in phrases"
-                    )
-
-                with control_cols[1]:
-                    include_common = st.checkbox(
-                        "Include common terms",
-                        value=False,
-                        help="Toggle to include/exclude common descriptive terms"
-                    )
-
-                # Process text data
-                text_data = filtered_df['content'].fillna('').astype(str)
-                non_empty_text = [text for text in text_data if text.strip()]
-
-                if non_empty_text:
-                    # Create and display chart using improved analysis
-                    word_freq_chart = create_word_freq_chart(
-                        pd.DataFrame({'content': non_empty_text}),
-                        include_common=include_common,
-                        min_words=word_range[0],
-                        max_words=word_range[1]
-                    )
-                else:
-                    st.warning("No text content available for analysis")
-                    word_freq_chart = None
-
-                if word_freq_chart is not None:
-                    st.plotly_chart(
-                        word_freq_chart,
-                        use_container_width=True,
-                        config={'displayModeBar': False}
-                    )
-
-                # Location chart
-                location_counts = get_location_counts(filtered_df)
-                st.plotly_chart(
-                    create_location_chart(location_counts),
-                    use_container_width=True,
-                    config={'displayModeBar': False}
-                )
+                with stage('phrase_chart'):
+                    render_phrase_panel(results)
+
+                with stage('location_chart'):
+                    render_location_panel(results)
 
             with col2:
-                # Sentiment pie chart
-                sentiment_counts = filtered_df['sentiment'].value_counts()
-                st.plotly_chart(
-                    create_pie_chart(sentiment_counts),
-                    use_container_width=True,
-                    config={'displayModeBar': False}
-                )
-
-                # Hashtag frequency chart
-                hashtag_freq = get_hashtag_frequency(filtered_df['content'])
-                st.plotly_chart(
-                    create_hashtag_chart(hashtag_freq),
-                    use_container_width=True,
-                    config={'displayModeBar': False}
-                )
-
-            st.markdown("""
-                <h3 style='text-align: center; margin: 2rem 0; 
-                font-size: clamp(1.2rem, 1.8vw, 1.8rem);'>📝 Top Viewed Posts</h3>
-            """, unsafe_allow_html=True)
-
-            table_df = create_user_table(filtered_df)
-            st.dataframe(
-                table_df,
-                hide_index=True,
-                use_container_width=True
-            )
+                with stage('sentiment_chart'):
+                    render_sentiment_panel(results)
+
+                with stage('hashtag_chart'):
+                    render_hashtag_panel(results)
+
+            with stage('top_posts'):
+                render_top_posts_panel(results)
+
+        with tab3, stage('trending'):
+            trending_store = load_trending_store(source, path)
+            if trending_store is None:
+                st.info("Trending terms will appear once counting finishes.")
+            else:
+                render_trending_panel(trending_store)
+
+        with tab4, stage('chat'):
+            # Chat pulls in langchain, so only load it when the tab is built
+            from src.views.chat_view import display_chat_tab
 
-        with tab3:
             display_chat_tab()
 
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         st.error(traceback.format_exc())
+
+
+# Each panel renders from the filtered results it is given. Panels with their
+# own widgets are fragments: changing those widgets reruns only that panel,
+# reusing the results passed in on the last full run.
+
+def render_engagement_panel(results):
+    st.plotly_chart(
+        create_engagement_scatter(results.scatter_frame()),
+        use_container_width=True,
+        config={
+            'displayModeBar': True,
+            'displaylogo': False,
+            'modeBarButtonsToRemove': ['lasso2d', 'select2d'],
+            'scrollZoom': True
+        }
+    )
+
+
+@st.fragment
+def render_phrase_panel(results):
+    # Word frequency section
+    st.markdown("### Phrase Analysis Settings")
+
+    # Controls in a single row
+    control_cols = st.columns([0.6, 0.4])
+    with control_cols[0]:
+        word_range = st.slider(
+            "Phrase Length (words)",
+            min_value=2,
+            max_value=8,
+            value=(2, 5),
+            help="Control the minimum and maximum number of words in phrases"
+        )
+
+    with control_cols[1]:
+        include_common = st.checkbox(
+            "Include common terms",
+            value=False,
+            help="Toggle to include/exclude common descriptive terms"
+        )
+
+    # Process text data
+    phrase_df = results.phrase_frame()
+
+    if len(phrase_df):
+        # Create and display chart using improved analysis
+        word_freq_chart = create_word_freq_chart(
+            phrase_df,
+            include_common=include_common,
+            min_words=word_range[0],
+            max_words=word_range[1],
+            weights=results.phrase_weights()
+        )
+    else:
+        st.warning("No text content available for analysis")
+        word_freq_chart = None
+
+    if word_freq_chart is not None:
+        st.plotly_chart(
+            word_freq_chart,
+            use_container_width=True,
+            config={'displayModeBar': False}
+        )
+
+
+def render_location_panel(results):
+    st.plotly_chart(
+        create_location_chart(results.location_counts()),
+        use_container_width=True,
+        config={'displayModeBar': False}
+    )
+
+
+def render_sentiment_panel(results):
+    sentiment_counts = results.sentiment_counts()
+    if sentiment_counts is None:
+        st.info("Sentiment distribution will appear once scoring finishes.")
+        return
+    st.plotly_chart(
+        create_pie_chart(sentiment_counts),
+        use_container_width=True,
+        config={'displayModeBar': False}
+    )
+
+
+def render_hashtag_panel(results):
+    st.plotly_chart(
+        create_hashtag_chart(results.hashtag_frequency()),
+        use_container_width=True,
+        config={'displayModeBar': False}
+    )
+
+
+def render_top_posts_panel(results):
+    st.markdown("""
+        <h3 style='text-align: center; margin: 2rem 0; 
+        font-size: clamp(1.2rem, 1.8vw, 1.8rem);'>📝 Top Viewed Posts</h3>
+    """, unsafe_allow_html=True)
+
+    st.dataframe(
+        create_user_table(results.top_posts()),
+        hide_index=True,
+        use_container_width=True
+    )
+
+
+@st.fragment
+def render_trending_panel(trending_store):
+    st.markdown("### Trending Now")
+
+    control_cols = st.columns(2)
+    with control_cols[0]:
+        window = st.number_input(
+            "Window (days)", min_value=1, max_value=14, value=1,
+            help="Count terms in the most recent days of the conference"
+        )
+    with control_cols[1]:
+        baseline = st.number_input(
+            "Baseline (days)", min_value=1, max_value=30, value=3,
+            help="Days before the window used as the expected rate for burst scoring"
+        )
+
+    if trending_store.latest is None:
+        st.info("No dated posts available for trending analysis.")
+        return
+
+    latest = trending_store.bucket_start(trending_store.latest).strftime('%b %d')
+    col1, col2 = st.columns(2)
+    for col, kind, prefix in [(col1, 'phrases', ''), (col2, 'hashtags', '#')]:
+        trending = trending_store.trending(kind, window=int(window), baseline=int(baseline))
+        with col:
+            if not trending:
+                st.info(f"No {kind} in the selected window.")
+                continue
+            st.plotly_chart(
+                create_trending_chart(trending, f"Trending {kind.capitalize()} (to {latest})", prefix),
+                use_container_width=True,
+                config={'displayModeBar': False}
+            )
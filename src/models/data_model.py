@@ -1,31 +1,47 @@
+import os
 import re
-import ssl
 from collections import Counter
+from functools import lru_cache
+from itertools import chain, islice
 
-import nltk
 import pandas as pd
-from nltk.corpus import stopwords
-from nltk.util import ngrams
-from textblob import TextBlob
 
-try:
-    _create_unverified_https_context = ssl._create_unverified_context
-except AttributeError:
-    pass
-else:
-    ssl._create_default_https_context = _create_unverified_https_context
+from src.models.sampling_model import assign_stratified_sample
 
-# Download stopwords if they're not already downloaded
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+# English stopwords from the NLTK corpus, bundled so startup never probes or
+# downloads nltk_data
+STOPWORDS_PATH = os.path.join(os.path.dirname(__file__), 'stopwords_english.txt')
+PHRASE_EXTRA_STOPWORDS = frozenset({'rt', 'via', 'amp', 'new', 'update'})
 
+# Precompiled patterns shared by ingest normalization and the per-text helpers
+URL_PATTERN = re.compile(r'http\S+|www\S+|https\S+')
+NON_WORD_PATTERN = re.compile(r"[^\w\s']")
+DIGIT_PATTERN = re.compile(r'\d+')
+HASHTAG_PATTERN = re.compile(r'#(\w+)')
+MENTION_PATTERN = re.compile(r'@(\w+)')
 
-def load_and_process_data(filepath='ttlc25.csv'):
+
+@lru_cache(maxsize=1)
+def get_stopwords():
+    """Load the bundled English stopword list once"""
+    with open(STOPWORDS_PATH, encoding='utf-8') as f:
+        return frozenset(line.strip() for line in f if line.strip())
+
+
+def ngrams(tokens, n):
+    """Yield successive n-token tuples, like nltk.util.ngrams"""
+    return zip(*(islice(tokens, i, None) for i in range(n)))
+
+
+def load_and_process_data(filepath='ttlc25.csv', sentiment_backend=None, detect_duplicates=True):
     """
     Loads and processes the CSV data, converting date strings to datetime
-    and handling numeric columns appropriately.
+    and handling numeric columns appropriately. Text is normalized once into
+    the columns added by normalize_posts, and a stratified sample for
+    approximate mode is drawn (stratum and sample_weight columns).
+    Near-duplicate posts share a cluster_id unless detect_duplicates is False.
+    If sentiment_backend is given ('textblob' or 'lexicon'), sentiment_score
+    and sentiment columns are added.
     """
     df = pd.read_csv(filepath)
     df['date'] = pd.to_datetime(df['date'])
@@ -37,11 +53,49 @@ def load_and_process_data(filepath='ttlc25.csv'):
     for col in numeric_columns:
         df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
 
+    normalize_posts(df)
+    assign_stratified_sample(df)
+
+    if detect_duplicates:
+        from src.models.dedup_model import assign_duplicate_clusters
+
+        df['cluster_id'] = assign_duplicate_clusters(df['content'])
+
+    if sentiment_backend is not None:
+        from src.models.sentiment_model import score_sentiment
+
+        score_sentiment(df, sentiment_backend)
+
+    return df
+
+
+def normalize_posts(df):
+    """
+    Single vectorized text normalization pass over the content column. Adds:
+    content_lower (lowercased text), tokens (phrase tokens without URLs,
+    punctuation or numbers; stopwords kept so callers can choose), hashtags
+    and mentions (lowercased, without # / @).
+    """
+    lowered = df['content'].fillna('').astype(str).str.lower()
+
+    cleaned = (lowered.str.replace(URL_PATTERN, '', regex=True)
+               .str.replace(NON_WORD_PATTERN, ' ', regex=True)
+               .str.replace(DIGIT_PATTERN, '', regex=True))
+
+    df['content_lower'] = lowered
+    # A plain comprehension over the split lists is much cheaper than
+    # exploding to one row per token and grouping back
+    df['tokens'] = [[token for token in (word.strip("'") for word in words) if len(token) > 2]
+                    for words in cleaned.str.split()]
+    df['hashtags'] = lowered.str.findall(HASHTAG_PATTERN)
+    df['mentions'] = lowered.str.findall(MENTION_PATTERN)
     return df
 
 
 def get_sentiment(text):
     """Calculate sentiment using TextBlob"""
+    from textblob import TextBlob
+
     try:
         return TextBlob(str(text)).sentiment.polarity
     except:
@@ -62,23 +116,11 @@ def analyze_text_content(text, include_common=False):
     Analyze text content using standard NLP techniques to extract meaningful phrases.
     Returns a list of tuples (phrase, count, frequency_score, num_words).
     """
-    # Convert to string and lowercase
-    text = str(text).lower()
-
-    # Remove URLs and clean text
-    text = re.sub(r'http\S+|www\S+|https\S+', '', text)
-    text = re.sub(r'[^a-z\s]', ' ', text)
-
-    # Tokenize and clean
-    tokens = [token.strip() for token in text.split() if len(token.strip()) > 2]
-
     # Get standard stopwords
-    stop_words = set(stopwords.words('english'))
-    if not include_common:
-        stop_words.update(['rt', 'via', 'amp'])  # Minimal social media terms
+    extra_stopwords = set() if include_common else {'rt', 'via', 'amp'}  # Minimal social media terms
 
-    # Filter tokens
-    filtered_tokens = [token for token in tokens if token not in stop_words]
+    # Tokenize, clean and filter tokens
+    filtered_tokens = filter_stopwords(phrase_tokens(text), extra_stopwords)
 
     # Generate n-grams and their frequencies
     all_phrases = []
@@ -101,41 +143,41 @@ def analyze_text_content(text, include_common=False):
     return sorted(all_phrases, key=lambda x: (-x[1], -x[2]))
 
 
-def get_word_frequency(text, include_common=False, min_words=2, max_words=5):
+def phrase_tokens(text):
     """
-    Get word frequencies filtered by word count and minimum frequency threshold.
-    Returns a Counter object with significant phrases.
+    Clean a single text the same way normalize_posts does and return its
+    tokens: lowercased, without URLs, punctuation or numbers, at least 3 chars.
     """
     # Ensure text is a string and clean it
     text = str(text).lower()
-
-    # Remove URLs
-    text = re.sub(r'http\S+|www\S+|https\S+', '', text)
+    text = URL_PATTERN.sub('', text)
 
     # Remove special characters but keep apostrophes for contractions
-    text = re.sub(r'[^\w\s\']', ' ', text)
-
-    # Remove numbers and extra whitespace
-    text = re.sub(r'\d+', '', text)
-    text = ' '.join(text.split())
-
-    if not text.strip():
-        return Counter()
+    text = NON_WORD_PATTERN.sub(' ', text)
+    text = DIGIT_PATTERN.sub('', text)
 
-    # Get stopwords
-    stop_words = set(stopwords.words('english'))
-    if not include_common:
-        stop_words.update(['rt', 'via', 'amp', 'new', 'update'])
-
-    # Tokenize and clean
     tokens = []
     for token in text.split():
         token = token.strip("'")  # Remove leading/trailing apostrophes
-        if (len(token) > 2 and
-                token not in stop_words and
-                not token.startswith(("'", "#", "@"))):
+        if len(token) > 2:
             tokens.append(token)
+    return tokens
+
+
+def filter_stopwords(tokens, extra_stopwords=()):
+    stop_words = get_stopwords()
+    if extra_stopwords:
+        stop_words = stop_words | set(extra_stopwords)
+    return [token for token in tokens if token not in stop_words]
+
 
+def tokenize_phrase_text(text, include_common=False):
+    """Tokens used for phrase extraction from a single text, stopwords removed"""
+    return filter_stopwords(phrase_tokens(text), () if include_common else PHRASE_EXTRA_STOPWORDS)
+
+
+def count_phrases(tokens, min_words=2, max_words=5):
+    """Count n-gram phrases within the word range, keeping those seen at least twice"""
     # Generate n-grams within word range
     phrases = []
     for n in range(min_words, max_words + 1):
@@ -155,14 +197,57 @@ def get_word_frequency(text, include_common=False, min_words=2, max_words=5):
     )))
 
 
+def get_word_frequency(text, include_common=False, min_words=2, max_words=5):
+    """
+    Get word frequencies filtered by word count and minimum frequency threshold.
+    Returns a Counter object with significant phrases.
+    """
+    tokens = tokenize_phrase_text(text, include_common)
+    if not tokens:
+        return Counter()
+    return count_phrases(tokens, min_words, max_words)
+
+
+def get_phrase_frequency(token_lists, include_common=False, min_words=2, max_words=5):
+    """
+    Same as get_word_frequency over the posts joined together, but reading the
+    token lists stored by normalize_posts instead of re-cleaning the text.
+    """
+    tokens = filter_stopwords(chain.from_iterable(token_lists),
+                              () if include_common else PHRASE_EXTRA_STOPWORDS)
+    if not tokens:
+        return Counter()
+    return count_phrases(tokens, min_words, max_words)
+
+
+def get_weighted_phrase_frequency(token_lists, weights, include_common=False, min_words=2, max_words=5):
+    """
+    Estimated phrase counts from sampled posts: each post's phrases count
+    sample_weight times. Phrases are taken within posts, and the same
+    minimum frequency as count_phrases applies to the estimates.
+    """
+    extra_stopwords = () if include_common else PHRASE_EXTRA_STOPWORDS
+    phrase_counts = Counter()
+    for tokens, weight in zip(token_lists, weights):
+        tokens = filter_stopwords(tokens, extra_stopwords)
+        for n in range(min_words, max_words + 1):
+            for gram in ngrams(tokens, n):
+                phrase_counts[' '.join(gram)] += weight
+
+    return Counter(dict(sorted(
+        {phrase: round(count) for phrase, count in phrase_counts.items()
+         if round(count) >= 2}.items(),
+        key=lambda x: (-x[1], x[0])
+    )))
+
+
 def get_hashtag_frequency(texts):
     """Extract and count hashtags from texts"""
-    hashtag_pattern = r'#(\w+)'
     hashtags = []
 
     for text in texts:
         if isinstance(text, str):
-            hashtags.extend(re.findall(hashtag_pattern, text.lower()))
+            hashtags.extend(HASHTAG_PATTERN.findall(text.lower()))
 
     return Counter(hashtags)
 
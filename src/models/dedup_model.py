@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+NUM_PERM = 128
+NUM_BANDS = 16  # 16 bands x 8 rows: candidate pairs start around 0.7 Jaccard
+SHINGLE_SIZE = 3
+SIMILARITY_THRESHOLD = 0.7
+CHUNK_SIZE = 2000
+
+# Mersenne prime 2^31 - 1 keeps (a * h + b) within 64 bits for 32-bit shingle hashes
+_PRIME = np.uint64((1 << 31) - 1)
+_SEED = 42
+
+
+def _normalize(texts):
+    return (texts.fillna('').astype(str).str.lower()
+            .str.replace(r'http\S+|www\S+', ' ', regex=True)
+            .str.replace(r'[^\w#@\s]', ' ', regex=True))
+
+
+def _shingles(tokens):
+    """Word k-shingles of a token list; short posts fall back to the whole text"""
+    if len(tokens) < SHINGLE_SIZE:
+        return [' '.join(tokens)]
+    return [' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)]
+
+
+def minhash_signatures(texts, num_perm=NUM_PERM, seed=_SEED):
+    """
+    Compute a (n_posts, num_perm) MinHash signature matrix. Shingles are hashed
+    with pandas' stable vectorized hash and reduced per post with
+    np.minimum.reduceat, processing CHUNK_SIZE posts at a time to bound memory.
+    Values are below _PRIME, so the matrix is stored as uint32.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, int(_PRIME), num_perm, dtype=np.uint64)
+    b = rng.integers(0, int(_PRIME), num_perm, dtype=np.uint64)
+
+    tokens = _normalize(pd.Series(texts, dtype=object)).str.split()
+    signatures = np.empty((len(tokens), num_perm), dtype=np.uint32)
+
+    for start in range(0, len(tokens), CHUNK_SIZE):
+        chunk = tokens.iloc[start:start + CHUNK_SIZE]
+        shingle_lists = [_shingles(post_tokens) for post_tokens in chunk]
+        lengths = np.fromiter((len(s) for s in shingle_lists), dtype=np.int64, count=len(shingle_lists))
+        flat = pd.Series([shingle for shingles in shingle_lists for shingle in shingles], dtype=object)
+
+        hashes = pd.util.hash_pandas_object(flat, index=False).to_numpy() & np.uint64(0xFFFFFFFF)
+        permuted = (hashes[:, None] * a + b) % _PRIME
+        offsets = np.r_[0, np.cumsum(lengths)[:-1]]
+        signatures[start:start + len(chunk)] = np.minimum.reduceat(permuted, offsets, axis=0).astype(np.uint32)
+
+    return signatures
+
+
+def lsh_clusters(signatures, num_bands=NUM_BANDS, threshold=SIMILARITY_THRESHOLD):
+    """
+    Cluster posts whose signatures collide in at least one LSH band. Within
+    each bucket every post is linked to the bucket's first post if their
+    estimated Jaccard similarity passes threshold, then connected components
+    give the clusters. Runs in O(n * num_bands), with no pairwise comparison.
+    Returns, for each post, the position of its cluster's first post.
+    """
+    from scipy import sparse
+    from scipy.sparse.csgraph import connected_components
+
+    n_posts, num_perm = signatures.shape
+    if n_posts == 0:
+        return np.zeros(0, dtype=np.int64)
+    rows_per_band = num_perm // num_bands
+    positions = np.arange(n_posts)
+
+    sources, targets = [], []
+    for band in range(num_bands):
+        band_sig = np.ascontiguousarray(signatures[:, band * rows_per_band:(band + 1) * rows_per_band])
+        keys = band_sig.view(np.dtype((np.void, band_sig.dtype.itemsize * rows_per_band))).ravel()
+        _, bucket_ids = np.unique(keys, return_inverse=True)
+
+        first = pd.Series(positions).groupby(bucket_ids).transform('min').to_numpy()
+        candidates = first != positions
+        if not candidates.any():
+            continue
+
+        docs, heads = positions[candidates], first[candidates]
+        keep = np.empty(len(docs), dtype=bool)
+        # Compare in chunks so the gathered signature rows stay small
+        for start in range(0, len(docs), CHUNK_SIZE):
+            end = start + CHUNK_SIZE
+            matches = signatures[docs[start:end]] == signatures[heads[start:end]]
+            keep[start:end] = matches.mean(axis=1) >= threshold
+        sources.append(docs[keep])
+        targets.append(heads[keep])
+
+    if sources:
+        sources, targets = np.concatenate(sources), np.concatenate(targets)
+    else:
+        sources = targets = np.zeros(0, dtype=np.int64)
+
+    graph = sparse.coo_matrix((np.ones(len(sources)), (sources, targets)), shape=(n_posts, n_posts))
+    _, labels = connected_components(graph, directed=False)
+    return pd.Series(positions).groupby(labels).transform('min').to_numpy()
+
+
+def assign_duplicate_clusters(texts):
+    """Return a cluster id per post; near-duplicates share the id of their first occurrence"""
+    return lsh_clusters(minhash_signatures(texts))
+
+
+def collapse_duplicates(df):
+    """Keep one post per near-duplicate cluster"""
+    if 'cluster_id' not in df.columns:
+        return df
+    return df.drop_duplicates('cluster_id')
@@ -0,0 +1,148 @@
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Datasets and standalone tasks whose results are kept: the current artifacts and trending store
+MAX_DATASETS = 2
+
+
+def _build_clusters(content, artifacts, sentiment_backend):
+    from src.models.dedup_model import assign_duplicate_clusters
+
+    return assign_duplicate_clusters(content)
+
+
+def _build_sentiment(content, artifacts, sentiment_backend):
+    """Score once per near-duplicate cluster; returns a DataFrame of sentiment columns"""
+    from src.models.sentiment_model import score_sentiment
+
+    df = pd.DataFrame({'content': content.to_numpy(), 'cluster_id': artifacts['clusters']})
+    score_sentiment(df, sentiment_backend)
+    return df[['sentiment_score', 'sentiment']]
+
+
+# artifact name -> (artifacts it depends on, builder)
+ARTIFACTS = {
+    'clusters': ((), _build_clusters),
+    'sentiment': (('clusters',), _build_sentiment),
+}
+
+
+class PrecomputeWorker:
+    """
+    Builds derived per-post artifacts for a loaded dataset on a background
+    thread pool. Views poll status() and render heavy panels as each artifact
+    becomes ready. Standalone builds such as the trending store run on the
+    same pool via submit_task(). One worker is shared by all sessions of a
+    server process.
+    """
+
+    def __init__(self, max_workers=2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='precompute')
+        self._lock = threading.Lock()
+        self._datasets = OrderedDict()  # dataset or task key -> {artifact: Future}
+
+    def submit(self, key, content, sentiment_backend='textblob'):
+        """Start building all artifacts for a dataset, unless already started"""
+        with self._lock:
+            if key in self._datasets:
+                self._datasets.move_to_end(key)
+                return
+            futures = {name: Future() for name in ARTIFACTS}
+            self._datasets[key] = futures
+            while len(self._datasets) > MAX_DATASETS:
+                self._datasets.popitem(last=False)
+
+        content = content.reset_index(drop=True)
+        for name in ARTIFACTS:
+            self._schedule(name, futures, content, sentiment_backend)
+
+    def submit_task(self, key, name, builder):
+        """
+        Run builder() once in the background as a single artifact named name,
+        unless already started. Its status and result are read with the same
+        key as dataset artifacts.
+        """
+        with self._lock:
+            if key in self._datasets:
+                self._datasets.move_to_end(key)
+                return
+            future = Future()
+            self._datasets[key] = {name: future}
+            while len(self._datasets) > MAX_DATASETS:
+                self._datasets.popitem(last=False)
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(builder())
+            except Exception as e:
+                logger.exception("Precompute of '%s' failed", name)
+                future.set_exception(e)
+
+        self._executor.submit(run)
+
+    def _schedule(self, name, futures, content, sentiment_backend):
+        """Run an artifact's builder once all of its dependencies have finished"""
+        depends_on, builder = ARTIFACTS[name]
+        pending = [futures[dep] for dep in depends_on]
+        remaining = [len(pending)]
+        lock = threading.Lock()
+
+        def run():
+            target = futures[name]
+            if not target.set_running_or_notify_cancel():
+                return
+            try:
+                artifacts = {dep: futures[dep].result() for dep in depends_on}
+                target.set_result(builder(content, artifacts, sentiment_backend))
+            except Exception as e:
+                logger.exception("Precompute of '%s' failed", name)
+                target.set_exception(e)
+
+        def on_dependency_done(_):
+            with lock:
+                remaining[0] -= 1
+                ready = remaining[0] == 0
+            if ready:
+                self._executor.submit(run)
+
+        if not pending:
+            self._executor.submit(run)
+        for dependency in pending:
+            dependency.add_done_callback(on_dependency_done)
+
+    def status(self, key):
+        """Return {artifact: 'queued' | 'running' | 'ready' | 'failed'} for a dataset"""
+        futures = self._datasets.get(key, {})
+        states = {}
+        for name, future in futures.items():
+            if future.done():
+                states[name] = 'failed' if future.exception() is not None else 'ready'
+            else:
+                states[name] = 'running' if future.running() else 'queued'
+        return states
+
+    def progress(self, key):
+        """Fraction of a dataset's artifacts that have finished"""
+        states = self.status(key)
+        if not states:
+            return 0.0
+        return sum(state in ('ready', 'failed') for state in states.values()) / len(states)
+
+    def ready_artifacts(self, key):
+        """Return {artifact: result} for every artifact that has been built successfully"""
+        futures = self._datasets.get(key, {})
+        return {name: future.result() for name, future in futures.items()
+                if future.done() and future.exception() is None}
+
+    def failed_artifacts(self, key):
+        futures = self._datasets.get(key, {})
+        return [name for name, future in futures.items()
+                if future.done() and future.exception() is not None]
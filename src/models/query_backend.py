@@ -0,0 +1,347 @@
+import os
+import zlib
+from collections import Counter
+from itertools import chain
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from src.models.data_model import get_hashtag_frequency, get_location_counts, load_and_process_data
+from src.models.dedup_model import collapse_duplicates
+
+DEFAULT_STORE_PATH = 'data/posts.parquet'
+
+# Charts that plot individual posts work from a bounded, deterministic sample
+# when the data lives in the store
+SCATTER_SAMPLE_ROWS = 5000
+PHRASE_SAMPLE_ROWS = 50000
+
+
+@dataclass
+class FilterState:
+    """Sidebar filter selections, applied either to a DataFrame or pushed down as SQL"""
+
+    start_date: object = None
+    end_date: object = None
+    user: str = None
+    sentiments: list = field(default_factory=list)
+    include_words: list = field(default_factory=list)
+    exclude_words: list = field(default_factory=list)
+    ranges: dict = field(default_factory=dict)
+    collapse_duplicates: bool = False
+
+    def to_sql(self):
+        """Return (where_clause, params) for the posts table"""
+        clauses, params = [], []
+        if self.start_date is not None:
+            clauses.append("CAST(date AS DATE) >= ?")
+            params.append(self.start_date)
+        if self.end_date is not None:
+            clauses.append("CAST(date AS DATE) <= ?")
+            params.append(self.end_date)
+        if self.user is not None:
+            clauses.append("user_name = ?")
+            params.append(self.user)
+        if self.sentiments:
+            clauses.append(f"sentiment IN ({', '.join('?' * len(self.sentiments))})")
+            params.extend(self.sentiments)
+        if self.include_words:
+            clauses.append("regexp_matches(content_lower, ?)")
+            params.append('|'.join(self.include_words))
+        if self.exclude_words:
+            clauses.append("NOT regexp_matches(content_lower, ?)")
+            params.append('|'.join(self.exclude_words))
+        for column, (low, high) in self.ranges.items():
+            clauses.append(f"{column} BETWEEN ? AND ?")
+            params.extend([low, high])
+
+        if self.collapse_duplicates:
+            # Keep the first post of each near-duplicate cluster among the matches
+            inner = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+            clauses.append(f"post_id IN (SELECT min(post_id) FROM posts {inner} GROUP BY cluster_id)")
+            params = params + params
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    # The same selections applied to a DataFrame. The steps are separate so
+    # the sidebar can narrow its options as it goes; apply() runs them all.
+
+    def filter_dates(self, df):
+        dates = df['date'].dt.date
+        mask = pd.Series(True, index=df.index)
+        if self.start_date is not None:
+            mask &= dates >= self.start_date
+        if self.end_date is not None:
+            mask &= dates <= self.end_date
+        return df[mask]
+
+    def filter_content(self, df):
+        """User, sentiment and word selections"""
+        if self.user is not None:
+            df = df[df['user_name'] == self.user]
+        if self.sentiments and 'sentiment' in df:
+            df = df[df['sentiment'].isin(self.sentiments)]
+        if self.include_words or self.exclude_words:
+            # Prefer the lowercased column stored at ingest over re-lowercasing every rerun
+            content_lower = df['content_lower'] if 'content_lower' in df else df['content'].str.lower()
+            mask = pd.Series(True, index=df.index)
+            if self.include_words:
+                mask &= content_lower.str.contains('|'.join(self.include_words), regex=True)
+            if self.exclude_words:
+                mask &= ~content_lower.str.contains('|'.join(self.exclude_words), regex=True)
+            df = df[mask]
+        return df
+
+    def filter_range(self, df, column):
+        if column not in self.ranges:
+            return df
+        low, high = self.ranges[column]
+        return df[(df[column] >= low) & (df[column] <= high)]
+
+    def filter_duplicates(self, df):
+        return collapse_duplicates(df) if self.collapse_duplicates else df
+
+    def apply(self, df):
+        """Return the posts in df matching every selection"""
+        df = self.filter_content(self.filter_dates(df))
+        for column in self.ranges:
+            df = self.filter_range(df, column)
+        return self.filter_duplicates(df)
+
+
+class FrameResults:
+    """
+    Dashboard aggregates computed in memory from an already filtered DataFrame.
+    Sentiment aggregates are None while background scoring is still running.
+    """
+
+    def __init__(self, filtered_df):
+        self.filtered_df = filtered_df
+
+    def __len__(self):
+        return len(self.filtered_df)
+
+    def metrics(self):
+        df = self.filtered_df
+        return {
+            'Total Posts': len(df),
+            'Total Views': int(df['views'].sum()),
+            'Total Reposts': int(df['reposts'].sum()),
+            'Total Followers': int(df['followers'].sum()),
+            'Avg. Sentiment': round(df['sentiment_score'].mean(), 2) if 'sentiment_score' in df else None
+        }
+
+    def metric_intervals(self):
+        """Exact figures have no error bounds"""
+        return None
+
+    def scatter_frame(self):
+        return self.filtered_df
+
+    def phrase_frame(self):
+        """Non-empty posts for the phrase chart, with their normalized tokens when available"""
+        df = self.filtered_df
+        non_empty = df['content'].fillna('').astype(str).str.strip() != ''
+        columns = ['tokens'] if 'tokens' in df else ['content']
+        return df.loc[non_empty, columns]
+
+    def phrase_weights(self):
+        """Every post counts once"""
+        return None
+
+    def location_counts(self):
+        return get_location_counts(self.filtered_df)
+
+    def sentiment_counts(self):
+        if 'sentiment' not in self.filtered_df:
+            return None
+        return self.filtered_df['sentiment'].value_counts()
+
+    def hashtag_frequency(self):
+        if 'hashtags' in self.filtered_df:
+            return Counter(chain.from_iterable(self.filtered_df['hashtags']))
+        return get_hashtag_frequency(self.filtered_df['content'])
+
+    def top_posts(self, limit=10):
+        return self.filtered_df.sort_values('views', ascending=False).head(limit)
+
+
+class PostStore:
+    """
+    Processed posts kept in Parquet and queried through an embedded DuckDB
+    connection. store_path may be a glob to span several conference archives.
+    """
+
+    def __init__(self, store_path=DEFAULT_STORE_PATH):
+        try:
+            import duckdb
+        except ImportError as e:
+            raise ImportError("The DuckDB query backend requires the 'duckdb' package") from e
+
+        self.store_path = store_path
+        self.con = duckdb.connect()
+        self.con.execute(f"CREATE VIEW posts AS SELECT * FROM read_parquet('{store_path}')")
+
+    def _query(self, sql, params=()):
+        # A cursor per query keeps the shared connection safe across sessions' threads
+        return self.con.cursor().execute(sql, list(params))
+
+    def iter_posts(self, columns, vectors_per_batch=64):
+        """Yield the given columns of every post as DataFrames of vectors_per_batch * 2048 rows"""
+        result = self._query(f"SELECT {', '.join(columns)} FROM posts")
+        while True:
+            batch = result.fetch_df_chunk(vectors_per_batch)
+            if batch.empty:
+                return
+            yield batch
+
+    def date_bounds(self):
+        low, high = self._query("SELECT min(date), max(date) FROM posts").fetchone()
+        return pd.Timestamp(low).date(), pd.Timestamp(high).date()
+
+    def count(self, filters):
+        where, params = filters.to_sql()
+        return self._query(f"SELECT count(*) FROM posts {where}", params).fetchone()[0]
+
+    def user_views(self, filters):
+        """Total views per user, highest first"""
+        where, params = filters.to_sql()
+        df = self._query(
+            f"SELECT user_name, sum(views) AS views FROM posts {where} "
+            f"GROUP BY user_name ORDER BY views DESC", params
+        ).fetchdf()
+        return df.set_index('user_name')['views']
+
+    def column_bounds(self, column, filters):
+        where, params = filters.to_sql()
+        low, high = self._query(f"SELECT min({column}), max({column}) FROM posts {where}", params).fetchone()
+        return int(low or 0), int(high or 0)
+
+    def results(self, filters):
+        return StoreResults(self, filters)
+
+
+class StoreResults:
+    """Dashboard aggregates pushed down to DuckDB; only small result sets come back"""
+
+    def __init__(self, store, filters):
+        self.store = store
+        self.where, self.params = filters.to_sql()
+        self._count = None
+
+    def _fetchdf(self, sql):
+        return self.store._query(sql.format(where=self.where), self.params).fetchdf()
+
+    def __len__(self):
+        if self._count is None:
+            self._count = self.store._query(
+                f"SELECT count(*) FROM posts {self.where}", self.params
+            ).fetchone()[0]
+        return self._count
+
+    def metrics(self):
+        row = self._fetchdf(
+            "SELECT count(*) AS posts, sum(views) AS views, sum(reposts) AS reposts, "
+            "sum(followers) AS followers, avg(sentiment_score) AS sentiment FROM posts {where}"
+        ).iloc[0]
+        self._count = int(row['posts'])
+        return {
+            'Total Posts': int(row['posts']),
+            'Total Views': int(row['views'] or 0),
+            'Total Reposts': int(row['reposts'] or 0),
+            'Total Followers': int(row['followers'] or 0),
+            'Avg. Sentiment': round(float(row['sentiment'] or 0), 2)
+        }
+
+    def metric_intervals(self):
+        return None
+
+    def scatter_frame(self):
+        return self._fetchdf(
+            "SELECT views, likes, followers, sentiment_score, user_name, content FROM posts {where} "
+            f"ORDER BY hash(content) LIMIT {SCATTER_SAMPLE_ROWS}"
+        )
+
+    def phrase_frame(self):
+        # Token lists normalized at build time, so the chart does not re-clean the text
+        with_tokens = f"{self.where} AND" if self.where else "WHERE"
+        return self.store._query(
+            f"SELECT tokens FROM posts {with_tokens} len(tokens) > 0 "
+            f"ORDER BY hash(content) LIMIT {PHRASE_SAMPLE_ROWS}", self.params
+        ).fetchdf()
+
+    def phrase_weights(self):
+        return None
+
+    def location_counts(self):
+        df = self._fetchdf(
+            "SELECT coalesce(location, 'Unknown') AS location, count(*) AS posts FROM posts {where} "
+            "GROUP BY 1 ORDER BY posts DESC"
+        )
+        return df.set_index('location')['posts'].rename('count')
+
+    def sentiment_counts(self):
+        df = self._fetchdf(
+            "SELECT sentiment, count(*) AS posts FROM posts {where} GROUP BY 1 ORDER BY posts DESC"
+        )
+        return df.set_index('sentiment')['posts'].rename('count')
+
+    def hashtag_frequency(self):
+        df = self._fetchdf(
+            "SELECT tag, count(*) AS posts FROM ("
+            "SELECT unnest(hashtags) AS tag FROM posts {where}"
+            ") GROUP BY tag ORDER BY posts DESC LIMIT 100"
+        )
+        return Counter(dict(zip(df['tag'], df['posts'].astype(int))))
+
+    def top_posts(self, limit=10):
+        return self._fetchdf(
+            "SELECT user_name, date, content, followers, views FROM posts {where} "
+            f"ORDER BY views DESC LIMIT {int(limit)}"
+        )
+
+
+def archive_id(archive):
+    """Stable 31-bit id for an archive name, used as the high bits of its post ids"""
+    return zlib.crc32(archive.encode('utf-8')) & 0x7FFFFFFF
+
+
+def build_post_store(filepath='ttlc25.csv', store_path=DEFAULT_STORE_PATH, sentiment_backend='textblob',
+                     archive=None):
+    """
+    Load, score and write the posts to a Parquet file for the DuckDB backend.
+    A store path may be a glob over several archives, so post_id and
+    cluster_id carry the archive's id in their high 32 bits and stay unique
+    across files; within an archive they keep the original post order.
+    archive defaults to the store file's name.
+    """
+    import duckdb
+
+    archive = archive or os.path.splitext(os.path.basename(store_path))[0]
+    prefix = archive_id(archive) << 32
+
+    df = load_and_process_data(filepath, sentiment_backend=sentiment_backend)
+    df['archive'] = archive
+    df['post_id'] = range(prefix, prefix + len(df))
+    df['cluster_id'] = prefix + df['cluster_id'].astype('int64')
+    os.makedirs(os.path.dirname(store_path) or '.', exist_ok=True)
+
+    con = duckdb.connect()
+    con.register('processed', df)
+    con.execute(f"COPY (SELECT * FROM processed ORDER BY date) TO '{store_path}' (FORMAT PARQUET)")
+    con.close()
+    return store_path
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the Parquet post store for the DuckDB query backend")
+    parser.add_argument('filepath', nargs='?', default='ttlc25.csv')
+    parser.add_argument('store_path', nargs='?', default=DEFAULT_STORE_PATH)
+    parser.add_argument('--sentiment-backend', default='textblob')
+    parser.add_argument('--archive', help="Archive name when several stores share a glob (default: file name)")
+    args = parser.parse_args()
+
+    print(f"Wrote {build_post_store(args.filepath, args.store_path, args.sentiment_backend, args.archive)}")
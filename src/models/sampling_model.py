@@ -0,0 +1,194 @@
+from collections import Counter
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+
+SAMPLE_PER_STRATUM = 2000
+Z_95 = 1.96
+TOP_POSTS_FIRST_CHUNK = 1000
+
+
+def stratum_labels(df):
+    """Sampling strata: one per (day, source) pair"""
+    days = df['date'].dt.strftime('%Y-%m-%d').fillna('undated')
+    return days + '|' + df['source'].fillna('unknown').astype(str)
+
+
+class StratifiedReservoir:
+    """
+    Uniform reservoir sample of up to per_stratum posts in each stratum,
+    maintained incrementally as posts are added. Each post gets a random key
+    and every stratum keeps its per_stratum smallest keys, which is
+    equivalent to classic reservoir sampling but vectorizes over batches.
+    """
+
+    def __init__(self, per_stratum=SAMPLE_PER_STRATUM, seed=0):
+        self.per_stratum = per_stratum
+        self.rng = np.random.default_rng(seed)
+        self.members = pd.DataFrame({'stratum': pd.Series(dtype=object), 'key': pd.Series(dtype=float)})
+        self.seen = pd.Series(dtype='int64')
+
+    def add(self, df):
+        strata = stratum_labels(df)
+        batch = pd.DataFrame({'stratum': strata, 'key': self.rng.random(len(df))}, index=df.index)
+        self.seen = self.seen.add(strata.value_counts(), fill_value=0).astype('int64')
+
+        candidates = pd.concat([self.members, batch])
+        rank = candidates.groupby('stratum')['key'].rank(method='first')
+        self.members = candidates[rank <= self.per_stratum]
+        return self
+
+    def weights(self, index):
+        """Inverse inclusion probability (N_s / n_s) for sampled posts, 0 for the rest"""
+        sampled = self.members['stratum'].value_counts()
+        stratum_weight = (self.seen / sampled).reindex(self.members['stratum']).to_numpy()
+        weights = pd.Series(stratum_weight, index=self.members.index)
+        return weights.reindex(index, fill_value=0.0)
+
+
+def assign_stratified_sample(df, per_stratum=SAMPLE_PER_STRATUM, seed=0):
+    """Add stratum and sample_weight columns; sample_weight is 0 for posts outside the sample"""
+    reservoir = StratifiedReservoir(per_stratum, seed).add(df)
+    df['stratum'] = stratum_labels(df)
+    df['sample_weight'] = reservoir.weights(df.index).to_numpy()
+    return df
+
+
+def filter_sample(sample, filters):
+    """
+    Apply a FilterState to a subset of the posts (the sample, or a chunk of
+    the corpus) directly. With collapsed duplicates, posts are kept if they
+    are the first post of their cluster in the corpus (cluster_id is that
+    post's position), which approximates keeping each cluster's first
+    matching post.
+    """
+    filtered = replace(filters, collapse_duplicates=False).apply(sample)
+    if filters.collapse_duplicates and 'cluster_id' in filtered:
+        filtered = filtered[filtered['cluster_id'].to_numpy() == filtered.index.to_numpy()]
+    return filtered
+
+
+def top_posts_by_views(df, view_order, filters, limit=10):
+    """
+    The limit most viewed posts matching filters. view_order holds df's row
+    positions by descending views; chunks of doubling size are filtered from
+    the top until enough posts match, so a typical selection only touches
+    the head of the frame. Duplicates are collapsed as in filter_sample.
+    """
+    matches, found = [], 0
+    start, size = 0, TOP_POSTS_FIRST_CHUNK
+    while start < len(view_order) and found < limit:
+        chunk = filter_sample(df.take(view_order[start:start + size]), filters)
+        matches.append(chunk)
+        found += len(chunk)
+        start, size = start + size, size * 2
+    if not matches:
+        return df.iloc[:0]
+    return pd.concat(matches).head(limit)
+
+
+class SampleResults:
+    """
+    Approximate dashboard aggregates from the stratified sample: the whole
+    sample plus its rows matching the filters (see filter_sample) give
+    stratified estimates with 95% confidence intervals, at a cost that
+    depends on the sample size, not the corpus size. Top posts are exact and
+    computed by the caller (see top_posts_by_views).
+    """
+
+    def __init__(self, sample_df, filtered_sample, top_posts):
+        self.sample = sample_df
+        self.filtered_sample = filtered_sample
+        self.member = sample_df.index.isin(filtered_sample.index)
+        self._top_posts = top_posts
+        self._metrics = None
+
+    def __len__(self):
+        return self.metrics()['Total Posts']
+
+    def _estimate_total(self, values):
+        """Stratified estimate of the filtered total of values, and its variance"""
+        z = np.where(self.member, values, 0.0)
+        weights = self.sample['sample_weight'].to_numpy()
+        grouped = pd.DataFrame({'z': z, 'w': weights, 'stratum': self.sample['stratum'].to_numpy()}).groupby('stratum')
+
+        n = grouped.size()
+        w = grouped['w'].first()
+        total = (grouped['z'].sum() * w).sum()
+        variance = ((n * w) ** 2 * (1 - 1 / w) * grouped['z'].var(ddof=1).fillna(0) / n).sum()
+        return total, variance
+
+    def _compute_metrics(self):
+        estimates, intervals = {}, {}
+        posts, variance = self._estimate_total(np.ones(len(self.sample)))
+        estimates['Total Posts'] = int(round(posts))
+        intervals['Total Posts'] = int(round(Z_95 * np.sqrt(variance)))
+
+        for metric, column in [('Total Views', 'views'), ('Total Reposts', 'reposts'),
+                               ('Total Followers', 'followers')]:
+            total, variance = self._estimate_total(self.sample[column].to_numpy(dtype=float))
+            estimates[metric] = int(round(total))
+            intervals[metric] = int(round(Z_95 * np.sqrt(variance)))
+
+        if 'sentiment_score' in self.sample and posts > 0:
+            scores = self.sample['sentiment_score'].to_numpy(dtype=float)
+            total, _ = self._estimate_total(scores)
+            ratio = total / posts
+            # Linearized variance of the ratio estimator
+            _, residual_var = self._estimate_total(scores - ratio)
+            estimates['Avg. Sentiment'] = round(ratio, 2)
+            intervals['Avg. Sentiment'] = round(Z_95 * np.sqrt(residual_var) / posts, 2)
+        else:
+            estimates['Avg. Sentiment'] = None
+            intervals['Avg. Sentiment'] = None
+
+        self._metrics = estimates, intervals
+
+    def metrics(self):
+        if self._metrics is None:
+            self._compute_metrics()
+        return dict(self._metrics[0])
+
+    def metric_intervals(self):
+        """95% confidence half-widths for the metric cards"""
+        if self._metrics is None:
+            self._compute_metrics()
+        return dict(self._metrics[1])
+
+    def scatter_frame(self):
+        return self.filtered_sample
+
+    def _phrase_rows(self):
+        df = self.filtered_sample
+        return df[df['content'].fillna('').astype(str).str.strip() != '']
+
+    def phrase_frame(self):
+        return self._phrase_rows()[['tokens']]
+
+    def phrase_weights(self):
+        """Sample weights aligned with phrase_frame()"""
+        return self._phrase_rows()['sample_weight']
+
+    def _weighted_counts(self, keys):
+        """Estimated number of filtered posts per key, like value_counts"""
+        counts = self.filtered_sample['sample_weight'].groupby(keys).sum()
+        return counts.round().astype(int).sort_values(ascending=False).rename('count')
+
+    def location_counts(self):
+        return self._weighted_counts(self.filtered_sample['location'].fillna('Unknown'))
+
+    def sentiment_counts(self):
+        if 'sentiment' not in self.filtered_sample:
+            return None
+        return self._weighted_counts(self.filtered_sample['sentiment'])
+
+    def hashtag_frequency(self):
+        counts = Counter()
+        for tags, weight in zip(self.filtered_sample['hashtags'], self.filtered_sample['sample_weight']):
+            for tag in tags:
+                counts[tag] += weight
+        return Counter({tag: int(round(count)) for tag, count in counts.items()})
+
+    def top_posts(self, limit=10):
+        return self._top_posts.head(limit)
@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+
+from src.models.data_model import get_sentiment
+
+NEGATIONS = ("no", "not", "n't", "never")
+NEGATION_WEIGHT = -0.5
+TOKEN_PATTERN = r"[a-z][a-z'-]*"
+
+
+class SentimentBackend:
+    """Base class for sentiment scorers. Subclasses score a whole column at once."""
+
+    name = None
+
+    def score(self, texts):
+        """Return a float array of polarity scores in [-1, 1], one per text"""
+        raise NotImplementedError
+
+
+class TextBlobBackend(SentimentBackend):
+    """Per-document TextBlob pattern analyzer (reference implementation)"""
+
+    name = 'textblob'
+
+    def score(self, texts):
+        return np.array([get_sentiment(text) for text in texts], dtype=float)
+
+
+class LexiconBackend(SentimentBackend):
+    """
+    Vectorized lexicon scorer. Builds a sparse document x term matrix of signed
+    token counts and multiplies it by the lexicon polarity vector, averaging
+    over the lexicon words found in each document.
+    """
+
+    name = 'lexicon'
+
+    def __init__(self, lexicon=None):
+        if lexicon is None:
+            lexicon = load_pattern_lexicon()
+        self.vocabulary = pd.Index(list(lexicon.keys()))
+        self.weights = np.fromiter(lexicon.values(), dtype=float, count=len(lexicon))
+
+    def score(self, texts):
+        from scipy import sparse
+
+        texts = pd.Series(texts, dtype=object).fillna('').astype(str).reset_index(drop=True)
+        n_docs = len(texts)
+        if n_docs == 0:
+            return np.zeros(0)
+
+        tokens = texts.str.lower().str.findall(TOKEN_PATTERN).explode().dropna()
+        doc_ids = tokens.index.to_numpy()
+
+        # A negation directly before a word in the same post flips and dampens it
+        prev_tokens = tokens.shift(1)
+        same_doc = np.r_[False, doc_ids[1:] == doc_ids[:-1]]
+        negated = same_doc & (prev_tokens.isin(NEGATIONS) | prev_tokens.str.endswith("n't", na=False)).to_numpy()
+
+        term_ids = self.vocabulary.get_indexer(tokens.to_numpy())
+        hits = term_ids >= 0
+        signs = np.where(negated[hits], NEGATION_WEIGHT, 1.0)
+
+        rows = doc_ids[hits].astype(np.int64)
+        shape = (n_docs, len(self.vocabulary))
+        signed_counts = sparse.csr_matrix((signs, (rows, term_ids[hits])), shape=shape)
+        hit_counts = np.bincount(rows, minlength=n_docs)
+
+        totals = signed_counts @ self.weights
+        scores = np.divide(totals, hit_counts, out=np.zeros(n_docs), where=hit_counts > 0)
+        return np.clip(scores, -1.0, 1.0)
+
+
+def load_pattern_lexicon():
+    """Load single-word polarities from the lexicon bundled with TextBlob"""
+    from textblob.en import sentiment as pattern_sentiment
+
+    pattern_sentiment.load()
+    lexicon = {}
+    for word, senses in pattern_sentiment.items():
+        if ' ' in word:
+            continue
+        if None in senses:
+            polarity = senses[None][0]
+        else:
+            polarity = float(np.mean([values[0] for values in senses.values()]))
+        lexicon[word.lower()] = polarity
+    return lexicon
+
+
+SENTIMENT_BACKENDS = {
+    TextBlobBackend.name: TextBlobBackend,
+    LexiconBackend.name: LexiconBackend,
+}
+
+
+def get_sentiment_backend(name='textblob'):
+    """Instantiate a sentiment backend by name"""
+    try:
+        return SENTIMENT_BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown sentiment backend '{name}'. "
+                         f"Choose one of: {', '.join(SENTIMENT_BACKENDS)}")
+
+
+def categorize_sentiment_scores(scores):
+    """Vectorized equivalent of categorize_sentiment"""
+    scores = np.asarray(scores, dtype=float)
+    return np.select([scores > 0, scores < 0], ['Positive', 'Negative'], default='Neutral')
+
+
+def score_sentiment(df, backend='textblob'):
+    """
+    Add sentiment_score and sentiment columns to df. When near-duplicate
+    clusters are present, each cluster is scored once and the score shared.
+    """
+    if isinstance(backend, str):
+        backend = get_sentiment_backend(backend)
+
+    if 'cluster_id' in df.columns:
+        representatives = df.drop_duplicates('cluster_id')
+        cluster_scores = pd.Series(backend.score(representatives['content']),
+                                   index=representatives['cluster_id'].to_numpy())
+        scores = cluster_scores.reindex(df['cluster_id'].to_numpy()).to_numpy()
+    else:
+        scores = backend.score(df['content'])
+
+    df['sentiment_score'] = scores
+    df['sentiment'] = categorize_sentiment_scores(scores)
+    return df
+
+
+def compare_backends(texts, reference='textblob', candidate='lexicon'):
+    """
+    Compare a candidate backend against a reference on the same texts.
+    Returns correlation, mean absolute error and category agreement.
+    """
+    ref_scores = get_sentiment_backend(reference).score(texts)
+    cand_scores = get_sentiment_backend(candidate).score(texts)
+
+    if ref_scores.std() > 0 and cand_scores.std() > 0:
+        correlation = float(np.corrcoef(ref_scores, cand_scores)[0, 1])
+    else:
+        correlation = float('nan')
+
+    return {
+        'documents': len(ref_scores),
+        'pearson_r': correlation,
+        'mean_abs_error': float(np.abs(ref_scores - cand_scores).mean()),
+        'category_agreement': float((categorize_sentiment_scores(ref_scores) ==
+                                     categorize_sentiment_scores(cand_scores)).mean()),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare sentiment backends against TextBlob")
+    parser.add_argument('filepath', nargs='?', default='ttlc25.csv')
+    parser.add_argument('--candidate', default='lexicon', choices=list(SENTIMENT_BACKENDS))
+    args = parser.parse_args()
+
+    contents = pd.read_csv(args.filepath)['content']
+    for key, value in compare_backends(contents, candidate=args.candidate).items():
+        print(f"{key:>20}: {value:.4f}" if isinstance(value, float) else f"{key:>20}: {value}")
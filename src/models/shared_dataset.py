@@ -0,0 +1,94 @@
+import json
+import os
+
+import pandas as pd
+
+from src.models.data_model import load_and_process_data
+
+DEFAULT_SHARED_PATH = '/dev/shm/ttlc25/posts.arrow'
+
+
+def _manifest_path(path):
+    return path + '.json'
+
+
+def build_shared_dataset(filepath='ttlc25.csv', out_path=DEFAULT_SHARED_PATH, sentiment_backend='textblob'):
+    """
+    Load and fully process the posts (normalized text columns, duplicate
+    clusters, sentiment) and write them as an uncompressed Arrow IPC file
+    that server processes can memory-map. The file and its manifest are each
+    written beside their final path and renamed into place, so readers never
+    see a partial dataset or manifest.
+    """
+    import pyarrow as pa
+
+    df = load_and_process_data(filepath, sentiment_backend=sentiment_backend)
+    df['post_id'] = range(len(df))
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, out_path)
+
+    manifest_path = _manifest_path(out_path)
+    tmp_manifest = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_manifest, 'w') as f:
+        json.dump({
+            'source': os.path.abspath(filepath),
+            'source_mtime': os.path.getmtime(filepath),
+            'sentiment_backend': sentiment_backend,
+            'rows': len(df),
+        }, f, indent=2)
+    os.replace(tmp_manifest, manifest_path)
+    return out_path
+
+
+def _arrow_backed(arrow_type):
+    """Keep string and list columns in Arrow memory instead of copying to Python objects"""
+    import pyarrow as pa
+
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type) or pa.types.is_list(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    return None
+
+
+def load_shared_dataset(path=DEFAULT_SHARED_PATH):
+    """
+    Memory-map a dataset written by build_shared_dataset read-only. Numeric
+    columns and Arrow-backed string columns reference the mapped pages
+    directly, so every process on the node shares one physical copy through
+    the page cache. Treat the returned frame as immutable.
+    """
+    import pyarrow as pa
+
+    source = pa.memory_map(path, 'r')
+    table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(types_mapper=_arrow_backed, split_blocks=True, self_destruct=False)
+
+
+def shared_dataset_is_current(path, filepath='ttlc25.csv', sentiment_backend='textblob'):
+    """True if the shared file exists and was built from the current source and backend"""
+    try:
+        with open(_manifest_path(path)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return (os.path.exists(path)
+            and manifest.get('source_mtime') == os.path.getmtime(filepath)
+            and manifest.get('sentiment_backend') == sentiment_backend)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the memory-mappable shared dataset")
+    parser.add_argument('filepath', nargs='?', default='ttlc25.csv')
+    parser.add_argument('out_path', nargs='?', default=DEFAULT_SHARED_PATH)
+    parser.add_argument('--sentiment-backend', default='textblob')
+    args = parser.parse_args()
+
+    print(f"Wrote {build_shared_dataset(args.filepath, args.out_path, args.sentiment_backend)}")
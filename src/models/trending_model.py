@@ -0,0 +1,178 @@
+import heapq
+import math
+import threading
+from collections import Counter
+
+import pandas as pd
+
+from src.models.data_model import PHRASE_EXTRA_STOPWORDS, filter_stopwords, ngrams, normalize_posts
+
+KINDS = ('phrases', 'hashtags')
+_EPOCH = pd.Timestamp('1970-01-01')
+
+
+def _add(counter, delta):
+    counter.update(delta)
+
+
+def _remove(counter, delta):
+    """Subtract delta from counter, dropping terms whose count reaches zero"""
+    for term, count in delta.items():
+        remaining = counter[term] - count
+        if remaining > 0:
+            counter[term] = remaining
+        else:
+            del counter[term]
+
+
+class _WindowState:
+    """
+    Running counts for one (kind, window, baseline) query shape. The window
+    covers buckets (end - window, end]; the baseline covers the `baseline`
+    buckets just before it.
+    """
+
+    def __init__(self, window, baseline):
+        self.window = window
+        self.baseline = baseline
+        self.end = None
+        self.current = Counter()
+        self.previous = Counter()
+
+    def rebuild(self, buckets, end):
+        self.end = end
+        self.current = Counter()
+        self.previous = Counter()
+        for idx in range(end - self.window - self.baseline + 1, end + 1):
+            counts = buckets.get(idx)
+            if counts:
+                _add(self.current if idx > end - self.window else self.previous, counts)
+
+    def advance(self, buckets, end):
+        """Slide forward one bucket at a time, touching only the buckets that change role"""
+        if self.end is None or end < self.end or end - self.end > self.window + self.baseline:
+            self.rebuild(buckets, end)
+            return
+        while self.end < end:
+            self.end += 1
+            entering = buckets.get(self.end)
+            moving = buckets.get(self.end - self.window)
+            leaving = buckets.get(self.end - self.window - self.baseline)
+            if entering:
+                _add(self.current, entering)
+            if moving:
+                _remove(self.current, moving)
+                _add(self.previous, moving)
+            if leaving:
+                _remove(self.previous, leaving)
+
+    def on_bucket_update(self, idx, delta):
+        if self.end is None or idx > self.end:
+            return
+        if idx > self.end - self.window:
+            _add(self.current, delta)
+        elif idx > self.end - self.window - self.baseline:
+            _add(self.previous, delta)
+
+
+class TrendingStore:
+    """
+    Time-bucketed phrase and hashtag counts. Posts can be added at any time;
+    sliding-window top-k and burst scores are maintained incrementally, so a
+    query costs O(vocabulary in window) rather than a rescan of the posts.
+    """
+
+    def __init__(self, freq='1D', min_words=2, max_words=3):
+        self.step = pd.to_timedelta(freq)
+        self.min_words = min_words
+        self.max_words = max_words
+        self._buckets = {kind: {} for kind in KINDS}  # kind -> bucket index -> Counter
+        self._windows = {}  # (kind, window, baseline) -> _WindowState
+        self._lock = threading.Lock()  # shared across sessions; queries mutate window state
+        self.latest = None
+
+    def bucket_index(self, timestamp):
+        return int((pd.Timestamp(timestamp) - _EPOCH) // self.step)
+
+    def bucket_start(self, idx):
+        return _EPOCH + idx * self.step
+
+    def _phrases(self, tokens):
+        tokens = filter_stopwords(tokens, PHRASE_EXTRA_STOPWORDS)
+        return [' '.join(gram)
+                for n in range(self.min_words, self.max_words + 1)
+                for gram in ngrams(tokens, n)]
+
+    def add_posts(self, posts):
+        """
+        Count the phrases and hashtags of new posts into their time buckets.
+        posts needs date and content columns; the tokens and hashtags columns
+        from normalize_posts are used when present.
+        """
+        if 'tokens' not in posts or 'hashtags' not in posts:
+            posts = normalize_posts(posts[['date', 'content']].copy())
+        posts = posts[['date', 'tokens', 'hashtags']].reset_index(drop=True)
+        dates = pd.to_datetime(posts['date'])
+        indices = ((dates - _EPOCH) // self.step).astype('int64')
+
+        for idx, positions in indices.groupby(indices).groups.items():
+            idx = int(idx)
+            deltas = {
+                'phrases': Counter(phrase for tokens in posts['tokens'][positions]
+                                   for phrase in self._phrases(tokens)),
+                'hashtags': Counter(tag for tags in posts['hashtags'][positions] for tag in tags),
+            }
+            with self._lock:
+                self._apply(idx, deltas)
+
+    def _apply(self, idx, deltas):
+        for kind, delta in deltas.items():
+            _add(self._buckets[kind].setdefault(idx, Counter()), delta)
+            for (state_kind, _, _), state in self._windows.items():
+                if state_kind == kind:
+                    state.on_bucket_update(idx, delta)
+        self.latest = idx if self.latest is None else max(self.latest, idx)
+
+    def _window(self, kind, window, baseline, end):
+        key = (kind, window, baseline)
+        state = self._windows.get(key)
+        if state is None:
+            state = self._windows[key] = _WindowState(window, baseline)
+        state.advance(self._buckets[kind], end)
+        return state
+
+    def trending(self, kind='hashtags', window=1, baseline=3, k=15, end=None):
+        """
+        Return the top-k terms in the last `window` buckets up to `end` (the
+        latest bucket by default) as (term, count, burst) tuples, ranked by
+        burst: a Poisson z-score of the window count against the rate in the
+        preceding `baseline` buckets. Terms at or below that rate are left out.
+        """
+        if self.latest is None:
+            return []
+        end = self.latest if end is None else self.bucket_index(end)
+        scale = window / baseline if baseline else 0
+        with self._lock:
+            state = self._window(kind, window, baseline, end)
+            scored = []
+            for term, count in state.current.items():
+                expected = state.previous.get(term, 0) * scale
+                # Only terms above their baseline rate are trending
+                if count > expected:
+                    scored.append((term, count, (count - expected) / math.sqrt(expected + 1)))
+        return heapq.nlargest(k, scored, key=lambda item: (item[2], item[1]))
+
+    def top_k(self, kind='hashtags', window=1, k=15, end=None):
+        """Return the k most frequent terms in the last `window` buckets as (term, count)"""
+        if self.latest is None:
+            return []
+        end = self.latest if end is None else self.bucket_index(end)
+        with self._lock:
+            return self._window(kind, window, 0, end).current.most_common(k)
+
+
+def build_trending_store(df, freq='1D'):
+    """Build a TrendingStore from a processed posts DataFrame"""
+    store = TrendingStore(freq=freq)
+    store.add_posts(df)
+    return store
@@ -1,7 +1,88 @@
+import io
+import logging
+import os
+
+import pandas as pd
 import streamlit as st
-from langchain_openai import ChatOpenAI
-from langchain.agents import initialize_agent, AgentType
-from langchain.memory import ConversationBufferMemory
+
+logger = logging.getLogger(__name__)
+
+# Token budgets for a single agent request. Recent turns are kept verbatim up
+# to MEMORY_MAX_TOKENS; older turns are folded into a rolling summary.
+PROMPT_MAX_TOKENS = 60000
+MEMORY_MAX_TOKENS = 2000
+QUESTION_MAX_TOKENS = 1000
+RESPONSE_RESERVE_TOKENS = 2000
+SYSTEM_MESSAGE_TEMPLATE = "You are an AI assistant that helps users analyze the following CSV data:\n\n{csv_string}\n\nAnswer user questions about this data."
+
+
+def count_tokens(llm, text):
+    """Count tokens with the model tokenizer, falling back to a 4 chars/token estimate"""
+    try:
+        return llm.get_num_tokens(text)
+    except Exception:
+        return len(text) // 4
+
+
+def fit_csv_to_budget(csv_string, llm, max_tokens):
+    """
+    Trim trailing CSV rows until the embedded data fits within max_tokens.
+    Rows are dropped whole so quoted multi-line posts are never cut in half.
+    """
+    tokens = count_tokens(llm, csv_string)
+    if tokens <= max_tokens:
+        return csv_string
+
+    df = pd.read_csv(io.StringIO(csv_string))
+    n_rows = len(df)
+    while n_rows > 0 and tokens > max_tokens:
+        n_rows = int(n_rows * max_tokens / tokens * 0.95)
+        csv_string = df.head(n_rows).to_csv(index=False)
+        tokens = count_tokens(llm, csv_string)
+
+    logger.info("Embedded CSV truncated to %d of %d rows (%d tokens)", n_rows, len(df), tokens)
+    return csv_string
+
+
+def get_memory(llm):
+    """Return the session's token-bounded conversation memory"""
+    if "memory" not in st.session_state:
+        from langchain.memory import ConversationSummaryBufferMemory
+
+        st.session_state.memory = ConversationSummaryBufferMemory(
+            llm=llm,
+            max_token_limit=MEMORY_MAX_TOKENS,
+            memory_key="chat_history",
+            return_messages=True
+        )
+    return st.session_state.memory
+
+
+def count_memory_tokens(memory):
+    """Count tokens currently held in memory (verbatim turns plus rolling summary)"""
+    tokens = count_tokens(memory.llm, memory.moving_summary_buffer)
+    try:
+        tokens += memory.llm.get_num_tokens_from_messages(memory.chat_memory.messages)
+    except Exception:
+        tokens += sum(count_tokens(memory.llm, str(m.content)) for m in memory.chat_memory.messages)
+    return tokens
+
+
+def fit_memory_to_budget(memory, max_tokens):
+    """
+    Shrink memory until it fits within max_tokens. The rolling summary holds
+    the oldest context and is otherwise unbounded, so it is cut down to its
+    most recent part first; only then are the oldest verbatim turns dropped.
+    """
+    while memory.moving_summary_buffer and count_memory_tokens(memory) > max_tokens:
+        summary = memory.moving_summary_buffer
+        memory.moving_summary_buffer = summary[len(summary) // 4 + 1:]
+
+    messages = memory.chat_memory.messages
+    while messages and count_memory_tokens(memory) > max_tokens:
+        messages.pop(0)
+    return count_memory_tokens(memory)
+
 
 def load_csv_data():
     try:
@@ -12,28 +93,77 @@ def load_csv_data():
         return None
 
 def setup_language_model():
+    # langchain is only imported once chat is actually usable
+    if not os.environ.get("OPENAI_API_KEY"):
+        return None
     try:
+        from langchain_openai import ChatOpenAI
+
         return ChatOpenAI(temperature=0, model="gpt-4o-mini")
     except Exception as e:
         st.error(f"Error initializing language model: {str(e)}")
         return None
 
+@st.cache_data(max_entries=1, show_spinner=False)
+def build_system_message(csv_string, _llm):
+    """
+    Trim the CSV to its token budget and build the system prompt once per CSV
+    content, rather than re-tokenizing it on every rerun. Returns the message
+    and its token count.
+    """
+    data_budget = PROMPT_MAX_TOKENS - MEMORY_MAX_TOKENS - QUESTION_MAX_TOKENS - RESPONSE_RESERVE_TOKENS
+    csv_string = fit_csv_to_budget(csv_string, _llm, data_budget)
+    system_message = SYSTEM_MESSAGE_TEMPLATE.format(csv_string=csv_string)
+    return system_message, count_tokens(_llm, system_message)
+
+
 def create_agent(csv_string, llm):
     if csv_string is None or llm is None:
         return None
-    if "memory" not in st.session_state:
-        st.session_state.memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
-    
-    return initialize_agent(
-        [], 
+
+    from langchain.agents import initialize_agent, AgentType
+
+    system_message, system_tokens = build_system_message(csv_string, llm)
+
+    agent = initialize_agent(
+        [],
         llm,
         agent=AgentType.CHAT_CONVERSATIONAL_REACT_DESCRIPTION,
         verbose=True,
-        memory=st.session_state.memory,
+        memory=get_memory(llm),
         agent_kwargs={
-            "system_message": f"You are an AI assistant that helps users analyze the following CSV data:\n\n{csv_string}\n\nAnswer user questions about this data."
+            "system_message": system_message
         }
     )
+    st.session_state.system_tokens = system_tokens
+    return agent
+
+
+def run_agent(agent, prompt):
+    """Run the agent on a question, enforcing the per-request prompt token cap"""
+    memory = agent.memory
+    question_tokens = count_tokens(memory.llm, prompt)
+    if question_tokens > QUESTION_MAX_TOKENS:
+        return f"Your question is too long ({question_tokens} tokens). Please keep it under {QUESTION_MAX_TOKENS} tokens."
+
+    memory_tokens = count_memory_tokens(memory)
+    system_tokens = st.session_state.get("system_tokens", 0)
+    total_tokens = system_tokens + memory_tokens + question_tokens
+    logger.info(
+        "Chat request tokens: system=%d memory=%d question=%d total=%d",
+        system_tokens, memory_tokens, question_tokens, total_tokens
+    )
+    prompt_limit = PROMPT_MAX_TOKENS - RESPONSE_RESERVE_TOKENS
+    if total_tokens > prompt_limit:
+        memory_budget = max(prompt_limit - system_tokens - question_tokens, 0)
+        memory_tokens = fit_memory_to_budget(memory, memory_budget)
+        total_tokens = system_tokens + memory_tokens + question_tokens
+        logger.info("Chat memory trimmed to %d tokens (total=%d)", memory_tokens, total_tokens)
+
+    if total_tokens > prompt_limit:
+        return "This request is too large to send. Please clear the chat and ask again."
+
+    return agent.run(prompt)
 
 def display_chat_interface(agent):
     st.title("Chat with TTLC Conference 2025 Data")
@@ -120,7 +250,7 @@ def display_chat_interface(agent):
         st.session_state.messages.append({"role": "user", "content": prompt})
         st.markdown(user_template.replace("{{MSG}}", prompt), unsafe_allow_html=True)
 
-        response = agent.run(prompt)
+        response = run_agent(agent, prompt)
         st.session_state.messages.append({"role": "assistant", "content": response})
         st.markdown(bot_template.replace("{{MSG}}", response), unsafe_allow_html=True)
 
@@ -141,10 +271,18 @@ def display_chat_tab():
         
         if st.button("Clear Chat"):
             st.session_state.messages = []
+            if "memory" in st.session_state:
+                st.session_state.memory.clear()
             st.rerun()
     
     # Main content
-    csv_string = load_csv_data()
+    display_chat_panel()
+
+
+@st.fragment
+def display_chat_panel():
+    # A fragment, so sending a message reruns only the chat and not the dashboard
     llm = setup_language_model()
+    csv_string = load_csv_data() if llm is not None else None
     agent = create_agent(csv_string, llm)
     display_chat_interface(agent)
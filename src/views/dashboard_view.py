@@ -1,6 +1,12 @@
+import os
+import time
+
 import streamlit as st
 import pandas as pd
 
+# Seconds without a filter change before approximate mode shows exact results
+APPROX_PAUSE_SECONDS = float(os.environ.get('APPROX_PAUSE_SECONDS', 3))
+
 
 def apply_custom_css(css_path='src/styles/custom_css.css'):
     """Apply custom CSS styling"""
@@ -37,5 +43,63 @@ def display_title():
 
 
 def create_tabs():
-    tab1, tab2, tab3 = st.tabs(["📈 Engagement", "📊 Analysis", "💬 Chat"])
-    return tab1, tab2, tab3  # Return all three tabs explicitly
+    tab1, tab2, tab3, tab4 = st.tabs(["📈 Engagement", "📊 Analysis", "🔥 Trending", "💬 Chat"])
+    return tab1, tab2, tab3, tab4  # Return all four tabs explicitly
+
+
+
+@st.fragment(run_every=1)
+def watch_precompute(worker, key):
+    progress = worker.progress(key)
+    if progress >= 1:
+        st.rerun()
+    pending = [name for name, state in worker.status(key).items() if state in ('queued', 'running')]
+    st.progress(progress, text=f"Running background analysis: {', '.join(pending)}…")
+
+
+def display_precompute_progress(worker, key, complete):
+    """
+    While background artifacts are missing from this run, show their progress
+    and rerun the page once they have all finished, so heavy panels fill in
+    without blocking first paint.
+    """
+    if not complete:
+        watch_precompute(worker, key)
+
+
+def exact_results_due(signature):
+    """
+    Track when the filtered selection last changed; True once exact results
+    have been requested for the current selection by pausing or by the
+    exact-results button.
+    """
+    state = st.session_state.setdefault('approximate', {'signature': None, 'changed_at': 0.0, 'exact': None})
+    if state['signature'] != signature:
+        state.update(signature=signature, changed_at=time.monotonic())
+    return state['exact'] == signature
+
+
+def request_exact_results(signature):
+    st.session_state['approximate']['exact'] = signature
+
+
+@st.fragment(run_every=1)
+def watch_for_pause(signature):
+    state = st.session_state['approximate']
+    if state['signature'] == signature and time.monotonic() - state['changed_at'] >= APPROX_PAUSE_SECONDS:
+        request_exact_results(signature)
+        st.rerun()
+
+
+def display_approximate_notice(signature):
+    """
+    Flag the dashboard as estimated and switch to exact results once the
+    selection has stayed unchanged for APPROX_PAUSE_SECONDS, or right away
+    when the user asks for them (e.g. before exporting).
+    """
+    col1, col2 = st.columns([0.75, 0.25])
+    col1.info("Approximate mode: figures are estimated from a stratified sample. "
+              "Exact results load when you pause.")
+    col2.button("Exact results", on_click=request_exact_results, args=(signature,),
+                help="Compute exact figures now, e.g. before exporting")
+    watch_for_pause(signature)
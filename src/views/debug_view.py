@@ -0,0 +1,28 @@
+import pandas as pd
+import streamlit as st
+
+
+def display_debug_panel(recorder):
+    """Show per-stage timings for the current rerun in a collapsible panel"""
+    if recorder is None:
+        return
+
+    with st.expander("⏱️ Performance Debug", expanded=False):
+        for note in recorder.notes:
+            st.caption(note)
+
+        stages_df = pd.DataFrame(recorder.records)
+        if not recorder.track_memory:
+            stages_df = stages_df.drop(columns=['peak_mb'])
+        st.dataframe(stages_df.drop(columns=['run']), hide_index=True, use_container_width=True)
+
+        st.download_button(
+            "Download CSV",
+            data=recorder.to_csv(),
+            file_name=f"ttlc_profile_{recorder.started_at}.csv",
+            mime="text/csv"
+        )
+
+        if recorder.profile_text:
+            st.markdown("**cProfile (top 30 by cumulative time)**")
+            st.code(recorder.profile_text, language=None)
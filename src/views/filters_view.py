@@ -1,136 +1,274 @@
+import os
+from contextlib import contextmanager
+
 import streamlit as st
 
+from src.models.query_backend import FilterState
+
+
+SENTIMENT_OPTIONS = ['Positive', 'Neutral', 'Negative']
+RANGE_FILTERS = [('likes', 'Likes'), ('followers', 'Followers')]
+NO_DATES_MESSAGE = "No data available for the selected date range. Please select different dates."
+NO_MATCHES_MESSAGE = "No data available after applying the selected filters. Please adjust your filter criteria."
+
+
+# Widget helpers shared by the pandas and DuckDB sidebars. Each renders one
+# control from options computed by the caller and returns the selection.
+
+def stop_with_error(message):
+    st.error(message)
+    st.stop()
+
 
-def apply_date_filter(df):
+def select_date_range(min_date, max_date):
     col1, col2 = st.columns(2)
     with col1:
         start_date = st.date_input(
             "Start Date",
-            value=df['date'].min().date(),
-            min_value=df['date'].min().date(),
-            max_value=df['date'].max().date()
+            value=min_date,
+            min_value=min_date,
+            max_value=max_date
         )
 
     with col2:
         end_date = st.date_input(
             "End Date",
-            value=df['date'].max().date(),
-            min_value=df['date'].min().date(),
-            max_value=df['date'].max().date()
+            value=max_date,
+            min_value=min_date,
+            max_value=max_date
         )
 
     if start_date > end_date:
-        st.error("End date must be after start date")
-        st.stop()
+        stop_with_error("End date must be after start date")
+    return start_date, end_date
 
-    mask = (df['date'].dt.date >= start_date) & (df['date'].dt.date <= end_date)
-    filtered_df = df[mask]
 
-    if len(filtered_df) == 0:
-        st.error("No data available for the selected date range. Please select different dates.")
-        st.stop()
-
-    return filtered_df
+def select_user(user_views):
+    """user_views: total views per user, highest first. Returns None for all users."""
+    selected_user = st.selectbox(
+        "Filter by User (Ranked by Views)",
+        options=['All Users'] + list(user_views.index),
+        format_func=lambda x: f"{x} ({int(user_views[x]):,} views)" if x != 'All Users' else x
+    )
+    return None if selected_user == 'All Users' else selected_user
 
 
-def apply_sentiment_filter(df):
-    sentiment_options = ['Positive', 'Neutral', 'Negative']
-    selected_sentiments = st.multiselect(
+def select_sentiments(available=True):
+    if not available:
+        st.caption("Sentiment filter will be available once scoring finishes.")
+        return []
+    return st.multiselect(
         "Select Sentiment",
-        options=sentiment_options,
-        default=sentiment_options
+        options=SENTIMENT_OPTIONS,
+        default=SENTIMENT_OPTIONS
     )
-    if selected_sentiments:
-        sentiment_mask = df['sentiment'].isin(selected_sentiments)
-        df = df[sentiment_mask]
-    return df
 
 
-def apply_word_filters(df):
-    include_words_input = st.text_input(
+def parse_word_list(words_input):
+    return [word.strip().lower() for word in words_input.split(',') if word.strip()]
+
+
+def select_words():
+    """Returns the (include, exclude) word lists"""
+    include_words = parse_word_list(st.text_input(
         "Include Posts with Words (comma-separated)",
         help="Enter words separated by commas to only include posts containing these words."
-    )
-    if include_words_input:
-        include_words = [word.strip().lower() for word in include_words_input.split(',') if word.strip()]
-        if include_words:
-            include_mask = df['content'].str.lower().str.contains('|'.join(include_words), regex=True)
-            df = df[include_mask]
-
-    exclude_words_input = st.text_input(
+    ))
+    exclude_words = parse_word_list(st.text_input(
         "Exclude Posts with Words (comma-separated)",
         help="Enter words separated by commas to exclude posts containing these words."
-    )
-    if exclude_words_input:
-        exclude_words = [word.strip().lower() for word in exclude_words_input.split(',') if word.strip()]
-        if exclude_words:
-            exclude_mask = ~df['content'].str.lower().str.contains('|'.join(exclude_words), regex=True)
-            df = df[exclude_mask]
-
-    return df
+    ))
+    return include_words, exclude_words
 
 
-def apply_numeric_filter(df, column, label):
-    min_val = int(df[column].min())
-    max_val = int(df[column].max())
-
+def select_range(column, label, min_val, max_val):
+    """Returns the selected (low, high), or None when there is nothing to choose"""
     if min_val == max_val:
         st.markdown(f"*All {'posts' if column == 'likes' else 'users'} have **{min_val}** {column}*")
-        return df
+        return None
 
-    value_range = st.slider(
+    return st.slider(
         f"Number of {label}",
         min_value=min_val,
         max_value=max_val,
         value=(min_val, max_val)
     )
-    mask = (df[column] >= value_range[0]) & (df[column] <= value_range[1])
-    return df[mask]
 
 
-def apply_user_filter(df):
-    # Get users sorted by total views
-    user_views = df.groupby('user_name')['views'].sum().sort_values(ascending=False)
-    user_options = ['All Users'] + list(user_views.index)
+def select_collapse():
+    return st.checkbox(
+        "Collapse near-duplicate posts",
+        value=False,
+        help="Show one post per group of retweet-style copies and templated announcements."
+    )
 
-    selected_user = st.selectbox(
-        "Filter by User (Ranked by Views)",
-        options=user_options,
-        format_func=lambda x: f"{x} ({int(user_views[x]):,} views)" if x != 'All Users' else x
+
+def select_filter_mode():
+    """Let the user choose between live filtering and batched 'Apply filters' submission"""
+    modes = {'Apply button': 'apply', 'Live': 'live'}
+    default = os.environ.get('FILTER_MODE', 'apply')
+    label = st.radio(
+        "Filter updates",
+        options=list(modes),
+        index=list(modes.values()).index(default) if default in modes.values() else 0,
+        horizontal=True,
+        help="'Apply button' stages your changes and refreshes the dashboard once when you click Apply. "
+             "'Live' refreshes after every change."
     )
+    return modes[label]
 
-    if selected_user != 'All Users':
-        df = df[df['user_name'] == selected_user]
 
-    return df
+def select_approximate_mode():
+    """Opt in to estimating the heavy aggregates from the ingest sample while exploring"""
+    return st.toggle(
+        "Approximate mode",
+        value=os.environ.get('APPROX_MODE', '0') == '1',
+        help="Estimate metrics and charts from a stratified sample while you adjust filters; "
+             "exact results load when you pause."
+    )
 
 
-def display_filters(df):
-    with st.sidebar:
-        st.markdown("""
-            <div style='padding: 1rem 0; border-bottom: 1px solid #e2e8f0;'>
-                <h3 style='font-size: 1.25rem; font-weight: 600; color: #1e293b;'>
-                    Dashboard Filters
-                </h3>
-                <p style='color: #64748b; font-size: 0.875rem;'>
-                    Refine your data view
-                </p>
-            </div>
-        """, unsafe_allow_html=True)
+@contextmanager
+def filter_form(batched):
+    """
+    Stage the filter widgets in a form when batched, so only the submitted
+    combination triggers a rerun. The submit button is rendered even if a
+    filter stops the script, since a form without one is invalid.
+    """
+    if not batched:
+        yield
+        return
+    with st.form('filters_form', border=False):
         try:
-            filtered_df = apply_date_filter(df)
-            filtered_df = apply_user_filter(filtered_df)
-            filtered_df = apply_sentiment_filter(filtered_df)
-            filtered_df = apply_word_filters(filtered_df)
-            filtered_df = apply_numeric_filter(filtered_df, 'likes', 'Likes')
-            filtered_df = apply_numeric_filter(filtered_df, 'followers', 'Followers')
+            yield
+        finally:
+            st.form_submit_button("Apply filters", type="primary", use_container_width=True)
 
-            if len(filtered_df) == 0:
-                st.error("No data available after applying the selected filters. Please adjust your filter criteria.")
-                st.stop()
 
-            return filtered_df
+def display_filters_header():
+    st.markdown("""
+        <div style='padding: 1rem 0; border-bottom: 1px solid #e2e8f0;'>
+            <h3 style='font-size: 1.25rem; font-weight: 600; color: #1e293b;'>
+                Dashboard Filters
+            </h3>
+            <p style='color: #64748b; font-size: 0.875rem;'>
+                Refine your data view
+            </p>
+        </div>
+    """, unsafe_allow_html=True)
 
+
+@contextmanager
+def filter_sidebar():
+    """Sidebar header, filter mode and optional form around the filter widgets"""
+    with st.sidebar:
+        display_filters_header()
+        try:
+            with filter_form(select_filter_mode() == 'apply'):
+                yield
         except Exception as e:
             st.error(f"Error with filter selection: {str(e)}")
-            st.stop()
\ No newline at end of file
+            st.stop()
+
+
+def display_filters(df):
+    """Render the sidebar filters over a DataFrame and return the matching posts"""
+    return display_frame_filters(df)[1]
+
+
+def display_frame_filters(df):
+    """
+    Render the sidebar filters over a DataFrame. Each control's options are
+    narrowed by the selections above it. Returns the FilterState and the
+    matching posts.
+    """
+    with filter_sidebar():
+        filters = FilterState()
+
+        filters.start_date, filters.end_date = select_date_range(df['date'].min().date(), df['date'].max().date())
+        df = filters.filter_dates(df)
+        if len(df) == 0:
+            stop_with_error(NO_DATES_MESSAGE)
+
+        filters.user = select_user(df.groupby('user_name')['views'].sum().sort_values(ascending=False))
+        filters.sentiments = select_sentiments('sentiment' in df)
+        filters.include_words, filters.exclude_words = select_words()
+        df = filters.filter_content(df)
+
+        for column, label in RANGE_FILTERS:
+            bounds = select_range(column, label, int(df[column].min()), int(df[column].max()))
+            if bounds is not None:
+                filters.ranges[column] = bounds
+                df = filters.filter_range(df, column)
+
+        filters.collapse_duplicates = select_collapse()
+        df = filters.filter_duplicates(df)
+
+        if len(df) == 0:
+            stop_with_error(NO_MATCHES_MESSAGE)
+        return filters, df
+
+
+def frame_filter_options(df):
+    """
+    Options for the sidebar controls over a whole DataFrame, not narrowed by
+    any selection: date bounds, total views per user and range bounds.
+    """
+    return {
+        'dates': (df['date'].min().date(), df['date'].max().date()),
+        'user_views': df.groupby('user_name')['views'].sum().sort_values(ascending=False),
+        'ranges': {column: (int(df[column].min()), int(df[column].max())) for column, _ in RANGE_FILTERS},
+    }
+
+
+def display_cached_filters(options, sentiment_available):
+    """
+    Same sidebar controls as display_frame_filters, with options computed once
+    per dataset by frame_filter_options instead of narrowed by the selections
+    above, so rendering them does no work over the posts. Returns the
+    FilterState; the caller applies it.
+    """
+    with filter_sidebar():
+        filters = FilterState()
+
+        filters.start_date, filters.end_date = select_date_range(*options['dates'])
+        filters.user = select_user(options['user_views'])
+        filters.sentiments = select_sentiments(sentiment_available)
+        filters.include_words, filters.exclude_words = select_words()
+
+        for column, label in RANGE_FILTERS:
+            bounds = select_range(column, label, *options['ranges'][column])
+            if bounds is not None:
+                filters.ranges[column] = bounds
+
+        filters.collapse_duplicates = select_collapse()
+        return filters
+
+
+def display_store_filters(store):
+    """
+    Same sidebar controls as display_filters, but each control's options are
+    queried from the post store and the selections are pushed down as SQL.
+    """
+    with filter_sidebar():
+        filters = FilterState()
+
+        filters.start_date, filters.end_date = select_date_range(*store.date_bounds())
+        if store.count(filters) == 0:
+            stop_with_error(NO_DATES_MESSAGE)
+
+        filters.user = select_user(store.user_views(filters))
+        filters.sentiments = select_sentiments()
+        filters.include_words, filters.exclude_words = select_words()
+
+        for column, label in RANGE_FILTERS:
+            bounds = select_range(column, label, *store.column_bounds(column, filters))
+            if bounds is not None:
+                filters.ranges[column] = bounds
+
+        filters.collapse_duplicates = select_collapse()
+
+        results = store.results(filters)
+        if len(results) == 0:
+            stop_with_error(NO_MATCHES_MESSAGE)
+        return results
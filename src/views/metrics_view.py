@@ -2,11 +2,13 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
-from src.models.data_model import get_word_frequency, analyze_text_content
+from src.models.data_model import get_phrase_frequency, get_weighted_phrase_frequency, get_word_frequency
 
 
 def create_engagement_scatter(df):
     """Create engagement scatter plot with updated aesthetics"""
+    # Sentiment may still be scoring in the background
+    has_sentiment = 'sentiment_score' in df
     fig = go.Figure()
     fig.add_trace(go.Scatter(
         x=df['views'],
@@ -14,9 +16,9 @@ def create_engagement_scatter(df):
         mode='markers',
         marker=dict(
             size=df['followers'] / 1000 + 10,
-            color=df['sentiment_score'],
+            color=df['sentiment_score'] if has_sentiment else '#1DA1F2',
             colorscale='RdYlBu',
-            showscale=True,
+            showscale=has_sentiment,
             colorbar=dict(title='Sentiment Score')
         ),
         text=[f"@{user}: {content[:50]}..." for user, content in zip(df['user_name'], df['content'])],
@@ -99,13 +101,22 @@ def create_time_series(df, metric, chart_type='line'):
     return fig
 
 
-def create_word_freq_chart(df, include_common=False, min_words=2, max_words=5):
-    """Create word frequency bar chart for phrases"""
-    # Combine all content for analysis
-    all_text = ' '.join(df['content'].astype(str))
-
-    # Get word frequencies using improved analysis
-    word_freq = get_word_frequency(all_text, include_common, min_words, max_words)
+def create_word_freq_chart(df, include_common=False, min_words=2, max_words=5, weights=None):
+    """
+    Create word frequency bar chart for phrases. weights, aligned with df,
+    gives each post's sample weight when the counts are estimates.
+    """
+    if weights is not None:
+        # Approximate mode: scale the sampled posts' phrases up to the selection
+        word_freq = get_weighted_phrase_frequency(df['tokens'], weights,
+                                                  include_common, min_words, max_words)
+    elif 'tokens' in df:
+        # Use the token lists normalized at ingest
+        word_freq = get_phrase_frequency(df['tokens'], include_common, min_words, max_words)
+    else:
+        # Combine all content for analysis
+        all_text = ' '.join(df['content'].astype(str))
+        word_freq = get_word_frequency(all_text, include_common, min_words, max_words)
 
     if not word_freq:
         st.info("No significant phrases found. Try including common terms or adjusting filters.")
@@ -202,8 +213,12 @@ def get_sentiment_display(sentiment_score):
         return "#f87171", "Negative"
 
 
-def display_metrics_with_icons(metrics):
-    """Display metrics with improved sentiment visualization"""
+def display_metrics_with_icons(metrics, intervals=None):
+    """
+    Display metrics with improved sentiment visualization. intervals maps
+    metric names to 95% confidence half-widths when the values are estimates.
+    """
+    intervals = intervals or {}
     icons = {
         'Total Posts': '📄',
         'Total Views': '👁️',
@@ -212,7 +227,17 @@ def display_metrics_with_icons(metrics):
     }
 
     sentiment_score = metrics.pop('Avg. Sentiment')
-    color, label = get_sentiment_display(sentiment_score)
+    if sentiment_score is None:
+        color, label = "#94a3b8", "Scoring…"
+    else:
+        color, label = get_sentiment_display(sentiment_score)
+
+    if sentiment_score is None:
+        sentiment_subtitle = '&nbsp;'
+    elif intervals.get('Avg. Sentiment'):
+        sentiment_subtitle = f"Score: {sentiment_score:.2f} ± {intervals['Avg. Sentiment']:.2f}"
+    else:
+        sentiment_subtitle = f'Score: {sentiment_score:.2f}'
 
     cols = st.columns(len(metrics) + 1)
 
@@ -255,8 +280,8 @@ def display_metrics_with_icons(metrics):
         col.markdown(f"""
             <div class='metric-card'>
                 <div class='metric-title'>{icons.get(metric, '')} {metric}</div>
-                <div class='metric-value'>{value:,}</div>
-                <div class='metric-subtitle'>&nbsp;</div>
+                <div class='metric-value'>{'≈' if intervals.get(metric) else ''}{value:,}</div>
+                <div class='metric-subtitle'>{f'± {intervals[metric]:,} (95% CI)' if intervals.get(metric) else '&nbsp;'}</div>
             </div>
         """, unsafe_allow_html=True)
 
@@ -265,7 +290,7 @@ def display_metrics_with_icons(metrics):
         <div class='metric-card'>
             <div class='metric-title'>📊 Overall Sentiment</div>
             <div class='metric-value' style='color: {color};'>{label}</div>
-            <div class='metric-subtitle'>Score: {sentiment_score:.2f}</div>
+            <div class='metric-subtitle'>{sentiment_subtitle}</div>
         </div>
     """, unsafe_allow_html=True)
 
@@ -329,4 +354,32 @@ def create_hashtag_chart(hashtag_freq):
         height=300,
         showlegend=False
     )
-    return fig
\ No newline at end of file
+    return fig
+
+
+def create_trending_chart(trending, title, prefix=''):
+    """Create bar chart of trending terms, coloured by burst score"""
+    fig = px.bar(
+        x=[count for _, count, _ in trending],
+        y=[f"{prefix}{term}" for term, _, _ in trending],
+        orientation='h',
+        color=[round(burst, 2) for _, _, burst in trending],
+        color_continuous_scale='OrRd',
+        labels={'color': 'Burst'}
+    )
+
+    fig.update_layout(
+        title={
+            'text': title,
+            'y': 0.95,
+            'x': 0.5,
+            'xanchor': 'center',
+            'yanchor': 'top'
+        },
+        yaxis={'categoryorder': 'array', 'categoryarray': [f"{prefix}{term}" for term, _, _ in reversed(trending)]},
+        xaxis_title='Count in window',
+        yaxis_title='',
+        margin=dict(t=50, b=0, l=150, r=0),
+        height=450
+    )
+    return fig
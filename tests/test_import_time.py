@@ -0,0 +1,16 @@
+import pytest
+
+pytest.importorskip('streamlit')
+
+from benchmarks.import_time import DEFAULT_BUDGET_SECONDS, ENTRY_MODULE, measure_import
+
+
+def test_controller_import_is_within_budget_and_lazy():
+    seconds, children, eager = measure_import()
+
+    assert eager == [], f"Imported eagerly instead of lazily: {', '.join(eager)}"
+    assert seconds <= DEFAULT_BUDGET_SECONDS, (
+        f"import {ENTRY_MODULE} took {seconds:.3f}s (budget {DEFAULT_BUDGET_SECONDS:.3f}s); slowest direct imports: "
+        + ', '.join(f"{name} {micros / 1e6:.3f}s" for name, micros in
+                    sorted(children.items(), key=lambda item: -item[1])[:5])
+    )